@@ -0,0 +1,162 @@
+import numpy as np
+import pandas as pd
+
+from cube import COUNTRY_DIM
+
+# Target bin counts of the histograms, which are binned here rather than in the browser
+DURATION_BINS = 20
+TEXT_LENGTH_BINS = 30
+SENTIMENT_BINS = 30
+
+
+class Selection:
+    # One filter state applied to the shared frame: the selected rows, whose chart
+    # counts come from the cube
+    def __init__(self, data, row_ids, state, cube):
+        self.data = data
+        self.row_ids = row_ids
+        self.state = state
+        self.cube = cube
+        self._frame = None
+        # States the cube cannot slice count over the selected rows instead
+        self.sliced_state = state if cube.supports(state) else None
+
+    def __len__(self):
+        return len(self.row_ids)
+
+    @property
+    def frame(self):
+        # Every column of the selected rows, copied out of the shared frame on first use
+        if self._frame is None:
+            self._frame = self.data.iloc[self.row_ids]
+        return self._frame
+
+    def take(self, columns):
+        # The selected rows of one column (or a list of them), without copying the rest
+        return self.data[columns].iloc[self.row_ids]
+
+    def distinct(self, dim):
+        # Distinct values of dim in the selection, not counting missing values
+        return int(self.count_by(dim).index.notna().sum())
+
+    def count_by(self, *dims):
+        return self.cube.aggregate(list(dims), self.row_ids, self.sliced_state)
+
+    def top_counts(self, dim):
+        # Like value_counts(): descending, ties in order of first appearance
+        return self.cube.aggregate([dim], self.row_ids, self.sliced_state, ranked=True)
+
+    @property
+    def country_dim(self):
+        # Co-productions count once per listed country when the state asks for all of them
+        return COUNTRY_DIM if self.state.all_countries else 'primary_country'
+
+
+def nice_step(span, bins):
+    # Smallest 1, 2, 2.5 or 5 times a power of ten giving at most bins bins over span
+    if span <= 0:
+        return 1.0
+    raw = span / bins
+    magnitude = 10 ** np.floor(np.log10(raw))
+    for factor in (1, 2, 2.5, 5, 10):
+        if factor * magnitude >= raw:
+            return float(factor * magnitude)
+
+
+def histogram(values, bins):
+    # Counts per bin with round bin edges, as a frame of bin_start, bin_end and count
+    values = pd.Series(values).to_numpy(dtype=float, na_value=np.nan)
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return pd.DataFrame({'bin_start': [], 'bin_end': [], 'count': []})
+    low, high = values.min(), values.max()
+    step = nice_step(high - low, bins)
+    start = np.floor(low / step) * step
+    edges = start + step * np.arange(int(np.floor((high - start) / step)) + 2)
+    counts, edges = np.histogram(values, bins=edges)
+    return pd.DataFrame({'bin_start': edges[:-1], 'bin_end': edges[1:], 'count': counts})
+
+
+def summary(values):
+    # Mean, min and max of a column, or None when every value is missing
+    values = pd.Series(values).to_numpy(dtype=float, na_value=np.nan)
+    if np.isnan(values).all():
+        return None
+    return {'mean': np.nanmean(values), 'min': np.nanmin(values), 'max': np.nanmax(values)}
+
+
+# Per-tab results for a selection; each returns the tables its tab draws from
+
+def overview(sel):
+    return {
+        'type_counts': sel.top_counts('type'),
+        'country_counts': sel.top_counts(sel.country_dim).head(8),
+        'yearly_data': sel.count_by('year_added', 'type').reset_index(name='count'),
+        'monthly_data': sel.count_by('month_added') if sel.distinct('year_added') > 1 else None,
+    }
+
+
+def genres(sel):
+    genre_counts = sel.top_counts('genres').head(15)
+    genre_type_data = sel.count_by('genres', 'type').reset_index(name='count')
+    top_genres_list = genre_counts.head(10).index.tolist()
+    genre_year_data = sel.count_by('year_added', 'genres').reset_index(name='count')
+    return {
+        'genre_counts': genre_counts,
+        'genre_type_filtered': genre_type_data[genre_type_data['genres'].isin(top_genres_list)],
+        'genre_year_data': genre_year_data[genre_year_data['genres'].isin(sel.state.genres)],
+    }
+
+
+def duration(sel):
+    frame = sel.take(['type', 'duration_minutes', 'duration_seasons'])
+    minutes = frame.loc[frame['type'] == 'Movie', 'duration_minutes']
+    seasons = frame.loc[frame['type'] == 'TV Show', 'duration_seasons']
+    return {
+        'movie_count': len(minutes),
+        'movie_durations': histogram(minutes, DURATION_BINS),
+        'movie_stats': summary(minutes),
+        'tv_count': len(seasons),
+        'season_counts': seasons.value_counts().head(10),
+        'season_stats': summary(seasons),
+    }
+
+
+def text(sel):
+    frame = sel.take(['description_length', 'title_length'])
+    return {
+        'description_lengths': histogram(frame['description_length'], TEXT_LENGTH_BINS),
+        'avg_description_length': frame['description_length'].mean(),
+        'avg_title_length': frame['title_length'].mean(),
+    }
+
+
+def sentiment(sel):
+    return {
+        'sentiment_counts': sel.top_counts('sentiment_label'),
+        'score_histogram': histogram(sel.take('sentiment_score'), SENTIMENT_BINS),
+    }
+
+
+def trends(sel):
+    country_trends = None
+    if sel.state.countries:
+        country_trends = sel.count_by('year_added', sel.country_dim).unstack().fillna(0)
+        country_trends = country_trends.loc[:, country_trends.columns.isin(sel.state.countries)]
+    numeric_cols = list(sel.data.select_dtypes(include=[np.number]).columns)
+    return {
+        'yearly_counts': sel.count_by('year_added'),
+        'type_trends': sel.count_by('year_added', 'type').unstack().fillna(0),
+        'country_trends': country_trends,
+        'corr_matrix': sel.take(numeric_cols).corr() if len(numeric_cols) > 1 else None,
+    }
+
+
+TAB_AGGREGATIONS = {
+    'overview': overview,
+    'genres': genres,
+    'duration': duration,
+    'text': text,
+    'sentiment': sentiment,
+    'trends': trends,
+}
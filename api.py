@@ -0,0 +1,261 @@
+import argparse
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from aggregations import TAB_AGGREGATIONS
+from cube import CUBE_DIMS, SET_SOURCES
+from data_store import ARTIFACT_PATH, SOURCE_CSV
+from engine import MEASURE_FUNCTIONS, EngineHolder
+from filters import FilterCache, FilterState, normalize_state
+from forecast import FORECAST_HORIZON, MAX_FORECAST_HORIZON
+from people import ROLES
+from search_index import SEARCH_FIELDS
+from shared_store import SHARED_DIR_ENV
+
+# A local HTTP/JSON front end to the analytics engine, so other tools share one warm
+# engine instead of loading the dataset themselves.
+#
+#   GET  /health   dataset version and row count
+#   GET  /schema   filter fields, dimensions, measures and tabs
+#   POST /query    one request object, or a list of them answered together
+#
+# A request is a filter plus one operation:
+#   {"filter": {"year_range": [2015, 2020], "content_type": "Movie"},
+#    "aggregate": {"dims": ["year_added", "type"], "measure": "count"}}
+#   {"filter": {...}, "tab": "overview"}
+#   {"filter": {"countries": ["France"], "all_countries": true}, "tab": "trends"}
+#   {"filter": {...}, "people": {}}
+#   {"filter": {...}, "collaborators": {"role": "director", "name": "Martin Scorsese"}}
+#   {"filter": {...}, "recommend": {"k": 10}}
+#   {"similar": {"show_id": "s1", "k": 10}}
+#   {"filter": {...}, "forecast": {"horizon": 12}}
+#   {"filter": {...}, "rows": {"columns": ["title"], "offset": 0, "limit": 100}}
+# Filter fields left out match everything. all_countries matches and counts every
+# country a title lists instead of only its first.
+
+DEFAULT_PORT = 8765
+
+# Rows a single rows request may return
+MAX_ROWS = 10_000
+
+# JSON types of the filter fields; year_range is checked on its own
+FILTER_FIELD_TYPES = {
+    'countries': list,
+    'content_type': str,
+    'genres': list,
+    'search_query': str,
+    'search_fields': list,
+    'all_countries': bool,
+}
+
+# Operations a request may carry, each with an object of options
+OPERATIONS = ('aggregate', 'tab', 'people', 'collaborators', 'recommend', 'similar', 'forecast', 'rows')
+
+
+def to_jsonable(value):
+    # Series and frames in pandas' 'split' layout plus their index names; NaN becomes null
+    if isinstance(value, (pd.Series, pd.DataFrame)):
+        result = json.loads(value.to_json(orient='split'))
+        result['index_names'] = list(value.index.names)
+        return result
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
+class QueryService:
+    # Answers JSON requests against the current engine. Requests in one batch that
+    # share a filter share one selection, and answers are cached per dataset version.
+    def __init__(self, holder, cache_size=1024, ttl=3600):
+        self.holder = holder
+        self.cache = FilterCache(maxsize=cache_size, ttl=ttl)
+
+    def state(self, engine, spec):
+        if not isinstance(spec, dict):
+            raise ValueError("filter must be an object")
+        fields = engine.default_state()._asdict()
+        unknown = set(spec) - set(fields)
+        if unknown:
+            raise ValueError(f"unknown filter fields {sorted(unknown)}")
+        for name, kind in FILTER_FIELD_TYPES.items():
+            if name in spec and not isinstance(spec[name], kind):
+                raise ValueError(f"filter field {name!r} must be a {kind.__name__}")
+        if 'year_range' in spec:
+            years = spec['year_range']
+            if (not isinstance(years, list) or len(years) != 2
+                    or not all(isinstance(y, int) and not isinstance(y, bool) for y in years)):
+                raise ValueError("year_range must be a list of two integer years")
+        unsearchable = set(spec.get('search_fields', [])) - set(SEARCH_FIELDS)
+        if unsearchable:
+            raise ValueError(f"search_fields must be among {SEARCH_FIELDS}")
+        fields.update(spec)
+        fields['year_range'] = tuple(fields['year_range'])
+        fields['search_fields'] = tuple(fields['search_fields']) or ('title',)
+        return FilterState(**fields)
+
+    def run(self, engine, selection, request):
+        for operation in OPERATIONS:
+            if operation != 'tab' and not isinstance(request.get(operation, {}), dict):
+                raise ValueError(f"{operation} must be an object")
+        if 'aggregate' in request:
+            spec = request['aggregate']
+            return engine.aggregate(selection, spec.get('dims', []), spec.get('measure', 'count'))
+        if 'tab' in request:
+            if request['tab'] not in TAB_AGGREGATIONS:
+                raise ValueError(f"unknown tab {request['tab']!r}")
+            return engine.tab(selection, request['tab'])
+        if 'people' in request:
+            return engine.people_tables(selection)
+        if 'collaborators' in request:
+            spec = request['collaborators']
+            if spec.get('role') not in ROLES:
+                raise ValueError(f"role must be one of {list(ROLES)}")
+            if not isinstance(spec.get('name'), str):
+                raise ValueError("collaborators needs the name of a person")
+            return engine.collaborators(selection, spec['role'], spec['name'])
+        if 'recommend' in request:
+            return engine.recommend(selection, int(request['recommend'].get('k', 10)))
+        if 'similar' in request:
+            spec = request['similar']
+            return engine.similar_titles(engine.row_of(spec['show_id']), int(spec.get('k', 10)))
+        if 'forecast' in request:
+            horizon = int(request['forecast'].get('horizon', FORECAST_HORIZON))
+            if not 1 <= horizon <= MAX_FORECAST_HORIZON:
+                raise ValueError(f"horizon must be between 1 and {MAX_FORECAST_HORIZON} months")
+            return engine.forecasts(selection, horizon)
+        if 'rows' in request:
+            spec = request['rows']
+            offset, limit = int(spec.get('offset', 0)), int(spec.get('limit', MAX_ROWS))
+            if offset < 0 or limit < 0:
+                raise ValueError("offset and limit must not be negative")
+            rows = engine.rows(selection, spec.get('columns'), offset, min(limit, MAX_ROWS))
+            return {'total': len(selection.row_ids), 'rows': rows}
+        return {'total': len(selection.row_ids)}
+
+    def execute(self, requests):
+        engine = self.holder.engine()
+        selections = {}
+        responses = []
+        for request in requests:
+            if not isinstance(request, dict):
+                responses.append({'error': "a request must be an object"})
+                continue
+            cache_key = (engine.dataset.version, json.dumps(request, sort_keys=True))
+            response = self.cache.get(cache_key)
+            if response is None:
+                try:
+                    state = normalize_state(self.state(engine, request.get('filter', {})))
+                    selection = selections.get(state)
+                    if selection is None:
+                        selection = selections[state] = engine.filter(state)
+                    response = {'result': to_jsonable(self.run(engine, selection, request))}
+                except (ValueError, KeyError, TypeError, IndexError) as e:
+                    responses.append({'error': str(e)})
+                    continue
+                self.cache.put(cache_key, response)
+            responses.append(response)
+        return responses
+
+    def health(self):
+        engine = self.holder.engine()
+        return {'version': engine.dataset.version, 'rows': len(engine.data)}
+
+    def schema(self):
+        engine = self.holder.engine()
+        return {
+            'filter': list(FilterState._fields),
+            'dimensions': CUBE_DIMS + list(SET_SOURCES),
+            'columns': list(engine.data.columns),
+            'measures': ['count'] + [f'{fn}:<column>' for fn in MEASURE_FUNCTIONS],
+            'tabs': list(TAB_AGGREGATIONS),
+            'roles': list(ROLES),
+        }
+
+
+def make_server(service, port=DEFAULT_PORT, host='127.0.0.1'):
+    class Handler(BaseHTTPRequestHandler):
+        def send_json(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            path = self.path.split('?')[0]
+            if path == '/health':
+                self.send_json(200, service.health())
+            elif path == '/schema':
+                self.send_json(200, service.schema())
+            else:
+                self.send_json(404, {'error': f"no such endpoint {path}"})
+
+        def do_POST(self):
+            if self.path.split('?')[0] != '/query':
+                self.send_json(404, {'error': f"no such endpoint {self.path}"})
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length))
+            except ValueError as e:
+                self.send_json(400, {'error': f"invalid JSON: {e}"})
+                return
+            if not isinstance(payload, (list, dict)):
+                self.send_json(400, {'error': "expected a request object or a list of them"})
+                return
+            batch = isinstance(payload, list)
+            try:
+                responses = service.execute(payload if batch else [payload])
+            except Exception as e:
+                # Anything a request did not cause, such as the dataset failing to load
+                self.send_json(500, {'error': f"{type(e).__name__}: {e}"})
+                return
+            self.send_json(200, responses if batch else responses[0])
+
+        def log_message(self, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def serve_in_background(service, port=DEFAULT_PORT, host='127.0.0.1'):
+    # Serves from a daemon thread; returns the server
+    server = make_server(service, port, host)
+    threading.Thread(target=server.serve_forever, name='analytics-api', daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the Netflix analytics engine over HTTP/JSON")
+    parser.add_argument('--host', default='127.0.0.1', help="Interface to listen on")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="Port to listen on")
+    parser.add_argument('--source', default=SOURCE_CSV, help="Source CSV path")
+    parser.add_argument('--artifact', default=ARTIFACT_PATH, help="Arrow IPC artifact path")
+    parser.add_argument('--shared-dir', default=os.environ.get(SHARED_DIR_ENV),
+                        help="Attach to datasets published by shared_store.py instead")
+    args = parser.parse_args()
+
+    service = QueryService(EngineHolder(args.shared_dir, args.source, args.artifact))
+    service.health()
+    server = make_server(service, args.port, args.host)
+    print(f"Serving analytics API on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
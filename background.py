@@ -0,0 +1,83 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from filters import FilterCache
+
+
+class BackgroundJobs:
+    # Results computed on a worker pool and kept in a bounded cache shared by all
+    # sessions. A job may be wanted by several owners (sessions); when an owner
+    # moves on to other keys, jobs no other owner waits for are cancelled if they
+    # have not started yet. A job that is already running finishes into the cache.
+    def __init__(self, workers=1, cache_size=128, ttl=3600, name='background'):
+        self.cache = FilterCache(maxsize=cache_size, ttl=ttl)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self.cancelled = 0
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, fn, *args, owner=None):
+        # Starts fn(*args) for key unless its result is cached or already on the way
+        if self.cache.get(key) is not None:
+            return
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None:
+                future = self.executor.submit(fn, *args)
+                job = self._jobs[key] = (future, set())
+            else:
+                future = None
+            if owner is not None:
+                job[1].add(owner)
+        if future is not None:
+            future.add_done_callback(lambda f: self._finish(key, f))
+
+    def get(self, key):
+        # (ready, result) for key; re-raises the exception of a failed job
+        outcome = self.cache.get(key)
+        if outcome is None:
+            return False, None
+        result, error = outcome
+        if error is not None:
+            raise error
+        return True, result
+
+    def result(self, key, fn, *args):
+        # The result for key, waiting for a pending job or computing it on the calling thread
+        ready, result = self.get(key)
+        if ready:
+            return result
+        with self._lock:
+            job = self._jobs.get(key)
+        if job is not None and not job[0].cancelled():
+            return job[0].result()
+        result = fn(*args)
+        self.cache.put(key, (result, None))
+        return result
+
+    def cancel_stale(self, owner, keep):
+        # Drops owner's interest in every job not in keep, cancelling jobs nobody else wants
+        with self._lock:
+            stale = []
+            for key, (future, owners) in self._jobs.items():
+                if owner in owners and key not in keep:
+                    owners.discard(owner)
+                    if not owners:
+                        stale.append((key, future))
+            for key, future in stale:
+                if future.cancel():
+                    del self._jobs[key]
+                    self.cancelled += 1
+
+    def pending(self):
+        with self._lock:
+            return len(self._jobs)
+
+    def _finish(self, key, future):
+        if future.cancelled():
+            return
+        error = future.exception()
+        self.cache.put(key, (future.result() if error is None else None, error))
+        with self._lock:
+            if key in self._jobs and self._jobs[key][0] is future:
+                del self._jobs[key]
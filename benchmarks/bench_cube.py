@@ -0,0 +1,78 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pipeline
+from aggregations import Selection
+from cube import COUNTRY_DIM, GENRE_DIM, CountCube
+from filters import FilterState, select_rows
+from indexes import MultiValueIndex
+from synthetic import make_catalog
+
+# The groupings the tabs and forecasts chart, answered by the cube and by pandas
+CHARTS = {
+    'type': ['type'],
+    'country': ['primary_country'],
+    'year x type': ['year_added', 'type'],
+    'month': ['month_added'],
+    'genre': [GENRE_DIM],
+    'genre x type': [GENRE_DIM, 'type'],
+    'year x genre': ['year_added', GENRE_DIM],
+    'sentiment': ['sentiment_label'],
+    'month x type': ['year_added', 'month_added', 'type'],
+}
+
+STATES = {
+    'default': FilterState((2015, 2021), ['United States', 'India', 'Japan'], 'All',
+                           ['Dramas', 'Comedies', 'TV Dramas'], ''),
+    'broad': FilterState((2008, 2021), [], 'All', [], ''),
+}
+
+
+def timed(fn, *args, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(*args)
+    return result, (time.perf_counter() - start) / repeat
+
+
+def pandas_counts(frame, dims):
+    # What the tabs computed before the cube: a groupby over the selected rows
+    if GENRE_DIM in dims:
+        frame = frame.explode(GENRE_DIM)
+    return frame.groupby(dims, observed=True).size()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chart counts from the cube against pandas over the selected rows")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 200_000])
+    args = parser.parse_args()
+
+    for n_rows in args.rows:
+        data = pipeline.engineer_features(make_catalog(n_rows))
+        rng = np.random.default_rng(0)
+        data['sentiment_label'] = rng.choice(['Positive', 'Neutral', 'Negative'], len(data))
+        genre_index = MultiValueIndex.from_lists(data['genres'])
+        country_index = MultiValueIndex.from_strings(data['country'].fillna(''))
+        cube = CountCube(data, {GENRE_DIM: genre_index, COUNTRY_DIM: country_index})
+        print(f"{n_rows:,} titles, {cube.n_cells:,} rollup cells")
+
+        for case, state in STATES.items():
+            row_ids = select_rows(data, state, genre_index)
+            selection, setup = timed(Selection, data, row_ids, state, cube)
+            frame, rows = timed(data.iloc.__getitem__, row_ids)
+            print(f"  {case}: {len(row_ids):,} selected | selection {setup * 1000:6.2f} ms"
+                  f" | row slice {rows * 1000:6.2f} ms")
+            for chart, dims in CHARTS.items():
+                _, cube_time = timed(selection.count_by, *dims)
+                _, pandas_time = timed(pandas_counts, frame, dims)
+                print(f"    {chart:14s} cube {cube_time * 1000:7.2f} ms | pandas {pandas_time * 1000:7.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pipeline
+from aggregations import Selection
+from cube import COUNTRY_DIM, GENRE_DIM, CountCube
+from filters import FilterState, select_rows
+from indexes import MultiValueIndex
+from synthetic import make_catalog
+
+
+# The copy-per-predicate filtering that filters.py replaced, kept as the baseline
+def legacy_rerun(data, state):
+    filtered = data.copy()
+    filtered = filtered[
+        (filtered['year_added'] >= state.year_range[0]) &
+        (filtered['year_added'] <= state.year_range[1])
+    ]
+    if state.countries:
+        filtered = filtered[filtered['primary_country'].isin(state.countries)]
+    if state.content_type != 'All':
+        filtered = filtered[filtered['type'] == state.content_type]
+    if state.genres:
+        filtered = filtered[filtered['genres'].apply(
+            lambda gs: any(g in state.genres for g in gs)
+        )]
+    if state.search_query:
+        filtered = filtered[filtered['title'].str.contains(state.search_query, case=False, na=False)]
+    movies_df = filtered[filtered['type'] == 'Movie'].copy()
+    tv_df = filtered[filtered['type'] == 'TV Show'].copy()
+    return filtered, movies_df, tv_df
+
+
+# Row ids and the metric cards from the cube; no rows are copied until a tab reads them
+def rerun(data, state, genre_index, cube):
+    selection = Selection(data, select_rows(data, state, genre_index), state, cube)
+    type_counts = selection.count_by('type')
+    return selection.row_ids, type_counts, selection.distinct('primary_country')
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(result[0]), elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-rerun allocation of the filter path")
+    parser.add_argument('--rows', type=int, default=200_000)
+    args = parser.parse_args()
+
+    data = pipeline.engineer_features(make_catalog(args.rows))
+    rng = np.random.default_rng(0)
+    data['sentiment_score'] = rng.uniform(-1, 1, len(data))
+    data['sentiment_label'] = np.where(data['sentiment_score'] > 0.2, 'Positive', 'Neutral')
+    genre_index = MultiValueIndex.from_lists(data['genres'])
+    country_index = MultiValueIndex.from_strings(data['country'].fillna(''))
+    cube = CountCube(data, {GENRE_DIM: genre_index, COUNTRY_DIM: country_index})
+
+    states = {
+        'default': FilterState((2015, 2021), ['United States', 'India', 'Japan'], 'All',
+                               ['Dramas', 'Comedies', 'TV Dramas'], ''),
+        'broad': FilterState((2008, 2021), [], 'All', [], ''),
+        'search': FilterState((2008, 2021), [], 'Movie', ['Dramas'], 'love'),
+    }
+    print(f"{args.rows:,} rows; peak traced allocation per rerun")
+    for name, state in states.items():
+        rows, old_time, old_peak = measure(legacy_rerun, data, state)
+        _, new_time, new_peak = measure(rerun, data, state, genre_index, cube)
+        print(f"{name:8s} {rows:>9,} selected | before {old_peak / 2**20:8.1f} MiB {old_time * 1000:8.1f} ms"
+              f" | after {new_peak / 2**20:8.1f} MiB {new_time * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from forecast import Forecaster, fit_holt
+
+
+def synthetic_series(n_series, n_months, seed=0):
+    # Poisson monthly additions around noisy upward trends of different sizes
+    rng = np.random.default_rng(seed)
+    scale = rng.lognormal(1.5, 1.0, size=(n_series, 1))
+    growth = np.linspace(0.2, 1.0, n_months) ** rng.uniform(0.5, 2.0, size=(n_series, 1))
+    return rng.poisson(scale * growth).astype(float)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched Holt fits against one fit per series")
+    parser.add_argument('--series', type=int, nargs='+', default=[10, 100, 500, 2000])
+    parser.add_argument('--months', type=int, default=168)
+    args = parser.parse_args()
+
+    print(f"{args.months} months per series")
+    for n_series in args.series:
+        values = synthetic_series(n_series, args.months)
+        keys = [('series', i) for i in range(n_series)]
+        _, looped = timed(lambda: [fit_holt(values[i:i + 1]) for i in range(n_series)])
+        forecaster = Forecaster(cache_size=2 * n_series)
+        _, batched = timed(forecaster.fits, keys, values)
+        _, cached = timed(forecaster.fits, keys, values)
+        print(f"{n_series:>6,} series | one at a time {looped * 1000:9.1f} ms"
+              f" | one batch {batched * 1000:8.1f} ms | cached {cached * 1000:7.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def build_once(csv_path, chunksize):
+    import data_store
+
+    workdir = os.path.dirname(csv_path)
+    start = time.perf_counter()
+    num_rows = data_store.build_dataset(
+        csv_path, os.path.join(workdir, f"bench_{chunksize}.arrow"), chunksize=chunksize
+    )
+    elapsed = time.perf_counter() - start
+    peak_mib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"chunksize {chunksize:>9,}: {num_rows:,} rows in {elapsed:.1f}s, peak RSS {peak_mib:,.0f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak memory of the artifact build by chunk size")
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--chunksizes', type=int, nargs='+', default=[10_000, 50_000, 200_000])
+    parser.add_argument('--csv', help=argparse.SUPPRESS)
+    parser.add_argument('--chunksize', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Each build runs in a fresh process so its peak RSS is measured on its own
+    if args.csv:
+        build_once(args.csv, args.chunksize)
+        return
+
+    from synthetic import make_catalog
+
+    with tempfile.TemporaryDirectory() as workdir:
+        csv_path = os.path.join(workdir, 'titles.csv')
+        make_catalog(args.rows).to_csv(csv_path, index=False)
+        for chunksize in args.chunksizes:
+            subprocess.run(
+                [sys.executable, __file__, '--csv', csv_path, '--chunksize', str(chunksize)],
+                check=True, cwd=workdir
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+import argparse
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data_store
+from search_index import SEARCH_FIELDS, SearchIndex
+from synthetic import make_catalog
+
+
+def column_bytes(series):
+    values = series.dropna()
+    if series.dtype == object and len(values) and isinstance(values.iloc[0], (list, np.ndarray)):
+        # memory_usage(deep=True) counts the list objects but not the strings they hold
+        return int(sum(sys.getsizeof(v) + sum(sys.getsizeof(s) for s in v) for v in values))
+    return int(series.memory_usage(index=False, deep=True))
+
+
+def compact_layout(artifact_path):
+    # Bytes and layout of every column as the app now holds it
+    frame = data_store.read_resident_frame(artifact_path)
+    layout = {col: (column_bytes(frame[col]), str(frame[col].dtype)) for col in frame.columns}
+    layout['genres'] = (data_store.read_genre_index(artifact_path).nbytes, 'CSR index')
+    for col in data_store.TEXT_COLUMNS:
+        layout[col] = (0, 'memory-mapped')
+    return layout
+
+
+def people_indexes(artifact_path):
+    # Cast and director stay mapped; these are the interned indexes built when a view needs them
+    return {col: data_store.read_people_index(col, artifact_path) for col in data_store.PEOPLE_COLUMNS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resident memory of the titles frame, per column")
+    parser.add_argument('--source', default=data_store.SOURCE_CSV, help="Source CSV path")
+    parser.add_argument('--rows', type=int, help="Use a synthetic catalog of this many rows instead")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        csv_path = args.source
+        if args.rows:
+            csv_path = os.path.join(workdir, 'titles.csv')
+            make_catalog(args.rows).to_csv(csv_path, index=False)
+        artifact_path = os.path.join(workdir, 'titles.arrow')
+        data_store.build_dataset(csv_path, artifact_path)
+
+        # The frame the app used to hold: every engineered column, genres as lists
+        previous = data_store.engineer_features(pd.read_csv(csv_path))
+        compact = compact_layout(artifact_path)
+        people = people_indexes(artifact_path)
+        search = SearchIndex(data_store.read_artifact_table(artifact_path, SEARCH_FIELDS))
+
+    print(f"{len(previous):,} titles; resident bytes per column")
+    print(f"{'column':20s} {'previous':>12s} {'compact':>12s}  layout")
+    total_before = total_after = 0
+    for col in previous.columns:
+        before = column_bytes(previous[col])
+        after, layout = compact.get(col, (0, 'dropped'))
+        total_before += before
+        total_after += after
+        print(f"{col:20s} {before / 1024:10.1f}Ki {after / 1024:10.1f}Ki  {layout}")
+    print(f"{'total':20s} {total_before / 2**20:10.2f}Mi {total_after / 2**20:10.2f}Mi"
+          f"  ({total_after / total_before:.0%} of previous)")
+    for col, index in people.items():
+        print(f"{col} as an interned CSR index: {index.nbytes / 1024:.1f}Ki "
+              f"({len(index.labels):,} names, {len(index.codes):,} credits)")
+    for field in SEARCH_FIELDS:
+        index = search.field(field)
+        print(f"{field} trigram search index: {index.nbytes / 1024:.1f}Ki "
+              f"({len(index.grams):,} trigrams, {len(index.posting_rows):,} postings)")
+    print(f"search index total: {search.nbytes / 2**20:.2f}Mi")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pipeline
+from synthetic import make_catalog
+
+
+# The row-wise implementation that pipeline.py replaced, kept as the baseline
+def legacy_engineer_features(df):
+    df['country'] = df['country'].fillna('Unknown')
+    df['cast'] = df['cast'].fillna('Unknown')
+    df['director'] = df['director'].fillna('Unknown')
+    df['description'] = df['description'].fillna('')
+    df['date_added'] = pd.to_datetime(df['date_added'], format='mixed', errors='coerce')
+    df['date_added'] = df.apply(
+        lambda row: pd.Timestamp(f"{row['release_year']}-01-01") if pd.isna(row['date_added']) else row['date_added'],
+        axis=1
+    )
+    df['year_added'] = df['date_added'].dt.year
+    df['month_added'] = df['date_added'].dt.month
+    df['genres'] = df['listed_in'].apply(lambda x: str(x).split(', '))
+    df['primary_country'] = df['country'].apply(lambda x: str(x).split(',')[0].strip())
+    df['duration_minutes'] = df['duration'].apply(lambda x:
+        int(str(x).split(' ')[0]) if 'min' in str(x) else np.nan)
+    df['duration_seasons'] = df['duration'].apply(lambda x:
+        int(str(x).split(' ')[0]) if 'Season' in str(x) else np.nan)
+    df['description_length'] = df['description'].apply(len)
+    df['title_length'] = df['title'].apply(len)
+    return df
+
+
+def time_run(fn, raw):
+    df = raw.copy()
+    start = time.perf_counter()
+    fn(df)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the feature-engineering pipeline")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Rows for the vectorized pipeline")
+    parser.add_argument('--legacy-rows', type=int, default=100_000,
+                        help="Rows for the row-wise baseline (0 to skip)")
+    args = parser.parse_args()
+
+    print(f"Generating {args.rows:,} synthetic rows...")
+    raw = make_catalog(args.rows)
+
+    elapsed = time_run(pipeline.engineer_features, raw)
+    print(f"vectorized: {args.rows:,} rows in {elapsed:.2f}s ({args.rows / elapsed:,.0f} rows/s)")
+
+    if args.legacy_rows:
+        subset = raw.head(args.legacy_rows)
+        elapsed = time_run(legacy_engineer_features, subset)
+        print(f"row-wise:   {len(subset):,} rows in {elapsed:.2f}s ({len(subset) / elapsed:,.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main()
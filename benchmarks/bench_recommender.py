@@ -0,0 +1,74 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pipeline
+from indexes import MultiValueIndex
+from recommender import FEATURE_WEIGHTS, Recommender
+from synthetic import make_catalog
+
+# The synthetic catalog's 27-word descriptions would make every title look alike;
+# recommendations are measured on descriptions drawn from a Zipfian vocabulary
+VOCABULARY = 20_000
+
+
+def zipf_descriptions(n_rows, seed=0, low=12, high=30):
+    rng = np.random.default_rng(seed)
+    letters = np.array(list('abcdefghijklmnopqrstuvwxyz'))
+    # Letters only, as descriptions are tokenized: word i spells i in base 26
+    codes = np.arange(VOCABULARY)[:, None] // 26 ** np.arange(4) % 26
+    words = np.asarray([''.join(w) for w in letters[codes]], dtype=object)
+    weights = 1 / np.arange(1, VOCABULARY + 1)
+    counts = rng.integers(low, high + 1, size=n_rows)
+    picks = words[rng.choice(VOCABULARY, size=counts.sum(), p=weights / weights.sum())]
+    bounds = np.r_[0, np.cumsum(counts)]
+    return [' '.join(picks[bounds[i]:bounds[i + 1]]) for i in range(n_rows)]
+
+
+def timed(fn, *args, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(*args)
+    return result, (time.perf_counter() - start) / repeat
+
+
+def recall(exact, approximate):
+    return np.mean([len(np.intersect1d(e[0], a[0])) / max(len(e[0]), 1) for e, a in zip(exact, approximate)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recommender build time and query latency by catalog size")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 50_000, 200_000])
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--queries', type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"top-{args.k}; latency per query, exact over every title and approximate over probed clusters")
+    for n_rows in args.rows:
+        data = pipeline.engineer_features(make_catalog(n_rows))
+        data['description'] = zipf_descriptions(n_rows)
+        genre_index = MultiValueIndex.from_lists(data['genres'])
+        recommender, build = timed(Recommender, data['description'], genre_index,
+                                   data['primary_country'], data['rating'], FEATURE_WEIGHTS, True)
+
+        rng = np.random.default_rng(1)
+        queries = rng.choice(n_rows, args.queries, replace=False)
+        selection = rng.choice(n_rows, n_rows // 10, replace=False)
+        _, single = timed(recommender.like_titles, queries[:1], args.k, False, repeat=20)
+        exact, batched = timed(recommender.like_titles, queries, args.k, False)
+        approximate, ann = timed(recommender.like_titles, queries, args.k, True)
+        _, centroid = timed(recommender.like_selection, selection, args.k, False, repeat=5)
+
+        print(f"{n_rows:>9,} titles | build {build:6.1f}s, {recommender.nbytes / 2**20:6.1f} MiB"
+              f" | single {single * 1000:7.2f} ms | batched {batched / args.queries * 1000:7.2f} ms"
+              f" | approximate {ann / args.queries * 1000:7.2f} ms, recall {recall(exact, approximate):.2f}"
+              f" | selection centroid {centroid * 1000:7.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
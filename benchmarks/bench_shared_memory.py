@@ -0,0 +1,83 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+import data_store
+import shared_store
+
+
+def memory_rollup():
+    # Anonymous (heap) and proportional resident memory of this process (Linux);
+    # pages of a mapped file are page cache, shared by every process mapping it
+    values = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                values[parts[0].rstrip(':')] = int(parts[1]) * 1024
+    return values['Anonymous'], values['Pss']
+
+
+def worker(mode, path):
+    # Loads the resident frame the way a dashboard worker would, then reads every
+    # column once (min/max allocates next to nothing) so mapped pages are faulted in
+    before, _ = memory_rollup()
+    if mode == 'shared':
+        frame = shared_store.attach_resident_frame(path)
+    else:
+        frame = data_store.read_resident_frame(path)
+    for col in frame.columns:
+        values = pa.array(frame[col])
+        if isinstance(values, pa.ChunkedArray):
+            values = values.combine_chunks()
+        if isinstance(values, pa.DictionaryArray):
+            values = values.indices
+        pc.min_max(values)
+    after, pss = memory_rollup()
+    print(after - before, pss)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-worker memory of a private vs a shared resident frame")
+    parser.add_argument('--source', default=data_store.SOURCE_CSV, help="Source CSV path")
+    parser.add_argument('--rows', type=int, help="Use a synthetic catalog of this many rows instead")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--worker', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(*args.worker)
+        return
+
+    with tempfile.TemporaryDirectory() as workdir:
+        csv_path = args.source
+        if args.rows:
+            from synthetic import make_catalog
+            csv_path = os.path.join(workdir, 'titles.csv')
+            make_catalog(args.rows).to_csv(csv_path, index=False)
+        dataset = shared_store.publish(csv_path, workdir)
+
+        print(f"{args.workers} workers; memory added by loading the frame, per worker")
+        for mode, path in [('private', dataset.artifact_path), ('shared', dataset.resident_path)]:
+            # Workers run side by side so shared pages are split between them in PSS
+            procs = [
+                subprocess.Popen([sys.executable, __file__, '--worker', mode, path],
+                                 stdout=subprocess.PIPE, text=True)
+                for _ in range(args.workers)
+            ]
+            results = [tuple(map(int, p.communicate()[0].split())) for p in procs]
+            owned = sum(r[0] for r in results) / len(results)
+            pss = sum(r[1] for r in results)
+            print(f"{mode:8s} heap {owned / 2**20:8.2f} MiB per worker, "
+                  f"total PSS {pss / 2**20:8.2f} MiB")
+
+
+if __name__ == '__main__':
+    main()
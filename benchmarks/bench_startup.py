@@ -0,0 +1,61 @@
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs the dashboard script once in this process and prints the wall time. Streamlit
+# itself is imported first, as it would already be by a running server.
+FIRST_RUN = """
+import sys, time
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=600).run()
+elapsed = time.perf_counter() - start
+assert not at.exception, at.exception
+print(elapsed)
+"""
+
+
+def first_run(app_path, workdir):
+    result = subprocess.run(
+        [sys.executable, '-c', FIRST_RUN, app_path],
+        cwd=workdir, capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.split()[-1])
+
+
+def checkout(rev, directory):
+    archive = subprocess.run(['git', 'archive', rev], cwd=ROOT, capture_output=True, check=True)
+    subprocess.run(['tar', '-x', '-C', directory], input=archive.stdout, check=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time to first paint: first script run in a fresh process")
+    parser.add_argument('--source', default=os.path.join(ROOT, 'netflix_titles.csv'), help="Source CSV path")
+    parser.add_argument('--baseline', default='HEAD~1', help="Git revision to compare against")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        trees = {args.baseline: os.path.join(tmp, 'baseline'), 'working tree': ROOT}
+        os.makedirs(trees[args.baseline])
+        checkout(args.baseline, trees[args.baseline])
+
+        print(f"first script run, median of {args.repeat} fresh processes (artifact already built)")
+        for name, tree in trees.items():
+            workdir = os.path.join(tmp, f"run-{len(os.listdir(tmp))}")
+            os.makedirs(workdir)
+            shutil.copy(args.source, os.path.join(workdir, 'netflix_titles.csv'))
+            app_path = os.path.join(tree, 'streamlit_app.py')
+            first_run(app_path, workdir)  # builds the artifact and sentiment cache
+            times = [first_run(app_path, workdir) for _ in range(args.repeat)]
+            print(f"{name:14s} {statistics.median(times):6.2f}s  (min {min(times):.2f}s, max {max(times):.2f}s)")
+
+
+if __name__ == '__main__':
+    main()
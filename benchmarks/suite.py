@@ -0,0 +1,220 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import data_store
+import pipeline
+from aggregations import Selection, TAB_AGGREGATIONS
+from cube import COUNTRY_DIM, GENRE_DIM, CountCube
+from filters import FilterState, select_rows
+from search_index import SEARCH_FIELDS, SearchIndex
+from sentiment import score_texts
+from synthetic import make_catalog
+
+# Catalog sizes run by default; larger ones, such as 10_000_000, are opt-in with --sizes
+SIZES = [10_000, 100_000, 1_000_000]
+
+# Rows generated and written per step, so large catalogs never sit in memory as a whole
+GENERATE_CHUNK_ROWS = 500_000
+
+# Distinct descriptions per catalog: ingestion scores each one once, as it would
+# with the sentiment cache of a catalog that is rebuilt regularly
+DESCRIPTION_POOL = 100_000
+
+# Cold VADER scoring is timed on at most this many unique descriptions
+SENTIMENT_ROWS = 20_000
+
+# Slowdowns smaller than this are timer noise, whatever the ratio
+MIN_REGRESSION_SECONDS = 0.002
+
+FILTER_CASES = {
+    'all': FilterState((2008, 2021), [], 'All', [], ''),
+    'years': FilterState((2018, 2020), [], 'All', [], ''),
+    'countries': FilterState((2008, 2021), ['United States', 'India', 'Japan'], 'All', [], ''),
+    'all_countries': FilterState((2008, 2021), ['United States', 'India', 'Japan'], 'All', [], '', ('title',), True),
+    'type': FilterState((2008, 2021), [], 'Movie', [], ''),
+    'genres': FilterState((2008, 2021), [], 'All', ['Dramas', 'Comedies', 'TV Dramas'], ''),
+    'search_title': FilterState((2008, 2021), [], 'All', [], 'love'),
+    'search_all_fields': FilterState((2008, 2021), [], 'All', [], 'love', tuple(SEARCH_FIELDS)),
+    'combined': FilterState((2015, 2021), ['United States', 'India'], 'Movie', ['Dramas', 'Comedies'], 'love'),
+}
+
+
+def timed(fn, *args, repeat=1):
+    # Median wall time over repeat calls, and the last call's result
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def write_catalog(path, n_rows):
+    for start in range(0, n_rows, GENERATE_CHUNK_ROWS):
+        size = min(GENERATE_CHUNK_ROWS, n_rows - start)
+        chunk = make_catalog(size, seed=start, start=start, description_pool=min(n_rows, DESCRIPTION_POOL))
+        chunk.to_csv(path, mode='a' if start else 'w', header=not start, index=False)
+
+
+def feature_engineering(csv_path):
+    # Parse and feature time over the streamed chunks; sentiment is timed on its own
+    parse = engineer = 0.0
+    chunks = data_store.iter_source_chunks(csv_path)
+    while True:
+        start = time.perf_counter()
+        chunk = next(chunks, None)
+        parse += time.perf_counter() - start
+        if chunk is None:
+            return parse, engineer
+        start = time.perf_counter()
+        pipeline.engineer_features(chunk)
+        engineer += time.perf_counter() - start
+
+
+def bench_size(n_rows, workdir, repeat, sentiment_rows):
+    results = []
+
+    def record(name, seconds, **extra):
+        results.append({'rows': n_rows, 'name': name, 'seconds': round(seconds, 6), **extra})
+        print(f"{n_rows:>11,} {name:32s} {seconds * 1000:12.2f} ms")
+
+    csv_path = os.path.join(workdir, f'titles_{n_rows}.csv')
+    artifact_path = os.path.join(workdir, f'titles_{n_rows}.arrow')
+    write_catalog(csv_path, n_rows)
+
+    parse, engineer = feature_engineering(csv_path)
+    record('ingest/csv_parse', parse)
+    record('ingest/feature_engineering', engineer)
+
+    texts = make_catalog(min(n_rows, sentiment_rows), seed=n_rows)['description']
+    seconds, _ = timed(score_texts, texts, os.path.join(workdir, f'cold_{n_rows}.sqlite'))
+    record('ingest/sentiment_cold', seconds, texts=len(texts))
+
+    seconds, _ = timed(data_store.build_dataset, csv_path, artifact_path)
+    record('ingest/build_artifact', seconds)
+
+    seconds, data = timed(data_store.read_resident_frame, artifact_path, repeat=repeat)
+    record('load/resident_frame', seconds)
+    seconds, genre_index = timed(data_store.read_genre_index, artifact_path, repeat=repeat)
+    record('load/genre_index', seconds)
+    seconds, country_index = timed(data_store.read_country_index, artifact_path, repeat=repeat)
+    record('load/country_index', seconds)
+    set_indexes = {GENRE_DIM: genre_index, COUNTRY_DIM: country_index}
+    seconds, cube = timed(CountCube, data, set_indexes, repeat=repeat)
+    record('load/cube', seconds, cells=cube.n_cells)
+    search_table = data_store.read_artifact_table(artifact_path, SEARCH_FIELDS)
+    seconds, search_index = timed(SearchIndex, search_table, repeat=repeat)
+    record('load/search_index', seconds)
+    # Each field's index is built by the first query that searches it; built once
+    # here, so the filter timings below measure queries only
+    for field in SEARCH_FIELDS:
+        seconds, index = timed(search_index.field, field)
+        record(f'search/build/{field}', seconds, bytes=index.nbytes)
+
+    for case, state in FILTER_CASES.items():
+        seconds, row_ids = timed(select_rows, data, state, genre_index, search_index, country_index, repeat=repeat)
+        record(f'filter/{case}', seconds, selected=int(len(row_ids)))
+        selection = Selection(data, row_ids, state, cube)
+        for tab, aggregate in TAB_AGGREGATIONS.items():
+            seconds, _ = timed(aggregate, selection, repeat=repeat)
+            record(f'tab/{tab}/{case}', seconds)
+
+    for path in (csv_path, artifact_path):
+        os.remove(path)
+    return results
+
+
+def environment():
+    try:
+        rev = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True,
+                             text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        rev = None
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'git_rev': rev,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'pyarrow': pa.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def compare(results, baseline_path, threshold):
+    with open(baseline_path) as f:
+        baseline = {(r['rows'], r['name']): r['seconds'] for r in json.load(f)['results']}
+    regressions = 0
+    print(f"\ncompared with {baseline_path} (regression above {threshold:.2f}x)")
+    for r in results:
+        before = baseline.get((r['rows'], r['name']))
+        if not before:
+            continue
+        ratio = r['seconds'] / before
+        slower = ratio > threshold and r['seconds'] - before > MIN_REGRESSION_SECONDS
+        flag = 'REGRESSION' if slower else ''
+        regressions += bool(flag)
+        print(f"{r['rows']:>11,} {r['name']:32s} {ratio:6.2f}x {flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless benchmarks of the dashboard's data paths")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help="Catalog sizes in rows")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per timing; the median is kept")
+    parser.add_argument('--sentiment-rows', type=int, default=SENTIMENT_ROWS,
+                        help="Unique descriptions scored for the cold sentiment timing")
+    parser.add_argument('--output', default='benchmark_results.json', help="JSON file for the results")
+    parser.add_argument('--compare', help="Earlier results file to compare against")
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help="Slowdown ratio reported as a regression by --compare")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output)
+    baseline = os.path.abspath(args.compare) if args.compare else None
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        # The ingestion sentiment cache is created in the working directory
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            for n_rows in args.sizes:
+                results.extend(bench_size(n_rows, workdir, args.repeat, args.sentiment_rows))
+        finally:
+            os.chdir(cwd)
+
+    report = {
+        'environment': environment(),
+        'settings': {
+            'repeat': args.repeat,
+            'description_pool': DESCRIPTION_POOL,
+            'sentiment_rows': args.sentiment_rows,
+        },
+        'results': results,
+    }
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nwrote {len(results)} timings to {output}")
+
+    if baseline and compare(results, baseline, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+# Synthetic catalogs shaped like netflix_titles.csv, for benchmarks only
+
+TYPES = ['Movie', 'TV Show']
+RATINGS = ['TV-MA', 'TV-14', 'TV-PG', 'R', 'PG-13', 'TV-Y7', 'TV-Y', 'PG', 'TV-G', 'NR', 'G']
+COUNTRIES = [
+    'United States', 'India', 'United Kingdom', 'Japan', 'South Korea', 'Canada',
+    'Spain', 'France', 'Mexico', 'Egypt', 'Turkey', 'Nigeria', 'Australia', 'Brazil',
+]
+MOVIE_GENRES = [
+    'Dramas', 'Comedies', 'Action & Adventure', 'Documentaries', 'International Movies',
+    'Independent Movies', 'Thrillers', 'Romantic Movies', 'Horror Movies', 'Children & Family Movies',
+]
+TV_GENRES = [
+    'International TV Shows', 'TV Dramas', 'TV Comedies', 'Crime TV Shows', 'Kids\' TV',
+    'Docuseries', 'Reality TV', 'Romantic TV Shows', 'Anime Series', 'TV Mysteries',
+]
+WORDS = [
+    'a', 'young', 'woman', 'man', 'family', 'secret', 'love', 'war', 'city', 'dangerous',
+    'journey', 'friends', 'mysterious', 'murder', 'happy', 'tragic', 'wonderful', 'life',
+    'detective', 'dream', 'school', 'hope', 'fear', 'brave', 'lost', 'comedy', 'star',
+]
+NAMES = [
+    'Alex Kim', 'Priya Shah', 'John Smith', 'Maria Garcia', 'Yuki Tanaka', 'Chen Wei',
+    'Fatima Bello', 'Liam Brown', 'Sofia Rossi', 'Omar Haddad', 'Emma Dubois', 'Raj Patel',
+]
+DESCRIPTION_POOL_SEED = 1234
+
+MONTHS = [
+    'January', 'February', 'March', 'April', 'May', 'June', 'July',
+    'August', 'September', 'October', 'November', 'December',
+]
+
+
+def _join_samples(rng, vocab, n, low, high, sep):
+    vocab = np.asarray(vocab, dtype=object)
+    counts = rng.integers(low, high + 1, size=n)
+    picks = vocab[rng.integers(0, len(vocab), size=counts.sum())]
+    bounds = np.r_[0, np.cumsum(counts)]
+    return [sep.join(picks[bounds[i]:bounds[i + 1]]) for i in range(n)]
+
+
+def make_catalog(n_rows, seed=0, start=0, description_pool=None):
+    # start offsets the show_ids so catalogs can be generated in chunks; with a
+    # description_pool, descriptions are drawn from that many distinct texts
+    rng = np.random.default_rng(seed)
+    is_movie = rng.random(n_rows) < 0.7
+    release_year = rng.integers(1960, 2022, size=n_rows)
+
+    year_added = np.maximum(release_year, rng.integers(2008, 2022, size=n_rows))
+    day = rng.integers(1, 29, size=n_rows)
+    month = np.asarray(MONTHS, dtype=object)[rng.integers(0, 12, size=n_rows)]
+    date_added = pd.Series(month + ' ' + day.astype(str) + ', ' + year_added.astype(str), dtype=object)
+    date_added[rng.random(n_rows) < 0.002] = np.nan
+
+    minutes = rng.integers(60, 200, size=n_rows).astype(str)
+    seasons = rng.integers(1, 10, size=n_rows)
+    season_text = np.where(seasons == 1, '1 Season', seasons.astype(str) + ' Seasons')
+    duration = pd.Series(np.where(is_movie, np.char.add(minutes, ' min'), season_text), dtype=object)
+
+    movie_genres = _join_samples(rng, MOVIE_GENRES, n_rows, 1, 3, ', ')
+    tv_genres = _join_samples(rng, TV_GENRES, n_rows, 1, 3, ', ')
+    country = pd.Series(_join_samples(rng, COUNTRIES, n_rows, 1, 3, ', '), dtype=object)
+    country[rng.random(n_rows) < 0.1] = np.nan
+    cast = pd.Series(_join_samples(rng, NAMES, n_rows, 1, 6, ', '), dtype=object)
+    cast[rng.random(n_rows) < 0.1] = np.nan
+    director = pd.Series(_join_samples(rng, NAMES, n_rows, 1, 1, ', '), dtype=object)
+    director[rng.random(n_rows) < 0.3] = np.nan
+
+    if description_pool:
+        # The pool does not depend on seed, so every chunk of a catalog shares it
+        pool_rng = np.random.default_rng(DESCRIPTION_POOL_SEED)
+        pool = np.asarray(_join_samples(pool_rng, WORDS, description_pool, 12, 30, ' '), dtype=object)
+        description = pool[rng.integers(0, description_pool, size=n_rows)]
+    else:
+        description = _join_samples(rng, WORDS, n_rows, 12, 30, ' ')
+
+    return pd.DataFrame({
+        'show_id': ['s' + str(start + i + 1) for i in range(n_rows)],
+        'type': np.where(is_movie, TYPES[0], TYPES[1]),
+        'title': _join_samples(rng, WORDS, n_rows, 1, 4, ' '),
+        'director': director,
+        'cast': cast,
+        'country': country,
+        'date_added': date_added,
+        'release_year': release_year,
+        'rating': np.asarray(RATINGS, dtype=object)[rng.integers(0, len(RATINGS), size=n_rows)],
+        'duration': duration,
+        'listed_in': np.where(is_movie, movie_genres, tv_genres),
+        'description': description,
+    })
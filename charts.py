@@ -0,0 +1,88 @@
+import numpy as np
+import plotly.express as px
+
+# Data points a chart may send to the browser. Line and area traces are thinned
+# to fit; bars, pies and heatmaps are already aggregated and are sent as they are.
+CHART_POINT_BUDGET = 2000
+
+# Per-point trace attributes thinned along with x and y
+POINT_ATTRIBUTES = ('x', 'y', 'text', 'hovertext', 'customdata')
+
+
+def histogram_bar(hist, **kwargs):
+    # A server-side histogram (bin_start, bin_end, count) drawn as touching bars
+    # centred on their bins
+    width = (hist['bin_end'] - hist['bin_start']).to_numpy()
+    fig = px.bar(
+        x=((hist['bin_start'] + hist['bin_end']) / 2).to_numpy(),
+        y=hist['count'].to_numpy(),
+        **kwargs
+    )
+    fig.update_traces(
+        width=width,
+        customdata=hist[['bin_start', 'bin_end']].to_numpy(),
+        hovertemplate='%{customdata[0]:.4g} to %{customdata[1]:.4g}<br>%{y}<extra></extra>'
+    )
+    fig.update_layout(bargap=0)
+    return fig
+
+
+def minmax_indices(values, buckets):
+    # Positions of the smallest and largest value of each of buckets equal runs of
+    # values, plus both ends, in order: keeps the peaks a line chart shows
+    n = len(values)
+    if n <= 2 * buckets:
+        return np.arange(n)
+    bucket = np.arange(n) * buckets // n
+    order = np.lexsort((values, bucket))
+    starts = np.flatnonzero(np.r_[True, bucket[order][1:] != bucket[order][:-1]])
+    ends = np.r_[starts[1:], n] - 1
+    return np.unique(np.r_[0, order[starts], order[ends], n - 1])
+
+
+def _trace_points(trace):
+    if getattr(trace, 'z', None) is not None:
+        return int(np.size(trace.z))
+    for axis in ('y', 'x'):
+        values = getattr(trace, axis, None)
+        if values is not None:
+            return len(values)
+    return 0
+
+
+def _is_line(trace):
+    return trace.type in ('scatter', 'scattergl') and 'lines' in (trace.mode or 'lines')
+
+
+def _stack_key(trace):
+    # WebGL traces cannot be stacked
+    return getattr(trace, 'stackgroup', None) or id(trace)
+
+
+def fit_to_budget(fig, budget=CHART_POINT_BUDGET):
+    # Thins the line and area traces of fig so the whole chart holds about budget
+    # points. Stacked traces share one set of x positions so their areas still line up.
+    lines = [t for t in fig.data if _is_line(t) and t.y is not None]
+    total = sum(_trace_points(t) for t in fig.data)
+    if total <= budget or not lines:
+        return fig
+
+    fixed = total - sum(_trace_points(t) for t in lines)
+    buckets = max(1, (budget - fixed) // len(lines) // 2)
+    groups = {}
+    for trace in lines:
+        key = _stack_key(trace)
+        values = np.asarray(trace.y, dtype=float)
+        keep = minmax_indices(values, buckets)
+        groups[key] = np.union1d(groups[key], keep) if key in groups else keep
+
+    for trace in lines:
+        keep = groups[_stack_key(trace)]
+        n = len(trace.y)
+        update = {}
+        for name in POINT_ATTRIBUTES:
+            values = getattr(trace, name, None)
+            if values is not None and not isinstance(values, str) and len(values) == n:
+                update[name] = np.asarray(values)[keep]
+        trace.update(update)
+    return fig
@@ -0,0 +1,393 @@
+import argparse
+import hashlib
+import os
+import re
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import pipeline
+import sentiment
+from indexes import MultiValueIndex
+
+SOURCE_CSV = "netflix_titles.csv"
+ARTIFACT_PATH = "netflix_titles.arrow"
+
+# Low-cardinality columns stored as dictionary-encoded (categorical) arrays
+CATEGORICAL_COLUMNS = ['type', 'rating', 'country', 'primary_country', 'sentiment_label']
+
+SOURCE_HASH_KEY = b'source_sha256'
+
+# Source hash characters in a versioned artifact's file name
+VERSION_HASH_CHARS = 16
+
+# Versioned artifacts kept on disk, so objects built from a recent version can still read it
+KEEP_ARTIFACT_VERSIONS = 3
+
+# Rows parsed, engineered and written per batch while building the artifact
+INGEST_CHUNKSIZE = 100_000
+
+# Read text columns as strings so every chunk infers the same types
+SOURCE_DTYPES = {
+    col: str for col in [
+        'show_id', 'type', 'title', 'director', 'cast', 'country', 'date_added',
+        'rating', 'duration', 'listed_in', 'description',
+    ]
+}
+
+# Long free-text columns stay in the memory-mapped artifact instead of the resident frame
+TEXT_COLUMNS = ['director', 'cast', 'duration', 'description']
+
+# Multi-valued columns held as integer-coded CSR indexes instead of per-row lists
+INDEXED_COLUMNS = ['genres']
+
+# Comma-separated name lists, interned into CSR indexes when needed; the
+# placeholder filled in during cleaning is not a name
+PEOPLE_COLUMNS = ['cast', 'director']
+MISSING_NAME = 'Unknown'
+
+# Resident dtypes: repetitive strings as categoricals, small counts as nullable small integers
+COMPACT_DTYPES = {
+    'listed_in': 'category',
+    'year_added': 'Int16',
+    'month_added': 'Int8',
+    'duration_minutes': 'Int16',
+    'duration_seasons': 'Int8',
+}
+
+# Hash of each title's source row, used to find changed rows on refresh
+ROW_HASH_COLUMN = 'row_hash'
+INTERNAL_COLUMNS = [ROW_HASH_COLUMN]
+
+
+def file_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def feature_steps(executor=None):
+    # Sentiment runs before the text lengths to keep the original column order;
+    # executor is a sentiment.scoring_pool() shared by every chunk of a build
+    return pipeline.FEATURE_STEPS[:-1] + [
+        partial(sentiment.add_sentiment, executor=executor), pipeline.add_text_lengths
+    ]
+
+
+def engineer_features(df, executor=None):
+    return pipeline.engineer_features(df, steps=feature_steps(executor))
+
+
+def iter_source_chunks(csv_path=SOURCE_CSV, chunksize=INGEST_CHUNKSIZE):
+    yield from pd.read_csv(csv_path, chunksize=chunksize, dtype=SOURCE_DTYPES)
+
+
+def source_row_hash(chunk):
+    # Hash of the raw source fields, taken before feature engineering modifies the frame
+    return pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+
+
+def iter_feature_chunks(chunks, executor=None):
+    for chunk in chunks:
+        row_hash = source_row_hash(chunk)
+        chunk = engineer_features(chunk, executor)
+        chunk[ROW_HASH_COLUMN] = row_hash
+        yield chunk
+
+
+class DictionaryEncoder:
+    # Dictionary-encodes a column chunk by chunk against one growing vocabulary,
+    # so each batch only adds a dictionary delta to the IPC file
+    def __init__(self):
+        self.vocab = []
+        self.codes = {}
+
+    def encode(self, values):
+        codes, uniques = pd.factorize(values)
+        for value in uniques:
+            if value not in self.codes:
+                self.codes[value] = len(self.vocab)
+                self.vocab.append(value)
+        mapping = np.array([self.codes[value] for value in uniques] + [0], dtype=np.int32)
+        indices = pa.array(mapping[codes], type=pa.int32(), mask=codes < 0)
+        return pa.DictionaryArray.from_arrays(indices, pa.array(self.vocab, type=pa.string()))
+
+
+def artifact_schema(df, source_hash):
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    for col in CATEGORICAL_COLUMNS:
+        i = schema.get_field_index(col)
+        schema = schema.set(i, pa.field(col, pa.dictionary(pa.int32(), pa.string())))
+    return with_source_hash(schema, source_hash)
+
+
+def with_source_hash(schema, source_hash):
+    metadata = dict(schema.metadata or {})
+    metadata[SOURCE_HASH_KEY] = source_hash.encode()
+    return schema.with_metadata(metadata)
+
+
+def to_record_batch(df, schema, encoders):
+    arrays = []
+    for field in schema:
+        if field.name in encoders:
+            arrays.append(encoders[field.name].encode(df[field.name]))
+        else:
+            array = pa.array(df[field.name], type=field.type, from_pandas=True)
+            # Arrow-backed pandas columns can come back in several chunks
+            if isinstance(array, pa.ChunkedArray):
+                array = array.combine_chunks()
+            arrays.append(array)
+    return pa.record_batch(arrays, schema=schema)
+
+
+def write_artifact(chunks, artifact_path, source_hash, schema=None):
+    # Appends engineered frames to a new artifact as record batches; the schema
+    # comes from the first frame unless an existing artifact's schema is reused
+    encoders = {col: DictionaryEncoder() for col in CATEGORICAL_COLUMNS}
+    options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+    num_rows = 0
+    writer = None
+
+    # Write next to the target and rename so readers never see a partial file
+    tmp_path = f"{artifact_path}.tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        try:
+            for chunk in chunks:
+                if writer is None:
+                    if schema is None:
+                        schema = artifact_schema(chunk, source_hash)
+                    else:
+                        schema = with_source_hash(schema, source_hash)
+                    writer = pa.ipc.new_file(sink, schema, options=options)
+                writer.write_batch(to_record_batch(chunk, schema, encoders))
+                num_rows += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+    if writer is None:
+        os.remove(tmp_path)
+        raise ValueError(f"no rows to write to {artifact_path}")
+    os.replace(tmp_path, artifact_path)
+    return num_rows
+
+
+def build_dataset(csv_path=SOURCE_CSV, artifact_path=ARTIFACT_PATH, source_hash=None,
+                  chunksize=INGEST_CHUNKSIZE):
+    # Streams the CSV through the feature pipeline one chunk at a time, so peak
+    # memory is bounded by the chunk size rather than the catalog size
+    if source_hash is None:
+        source_hash = file_hash(csv_path)
+    with sentiment.scoring_pool() as executor:
+        chunks = iter_feature_chunks(iter_source_chunks(csv_path, chunksize), executor)
+        return write_artifact(chunks, artifact_path, source_hash)
+
+
+def match_rows(chunk, row_hash, previous):
+    # Position in the previous artifact of each source row whose show_id and
+    # row hash are unchanged, or -1 for rows that need to be engineered
+    current = pd.DataFrame({'show_id': chunk['show_id'].to_numpy(), ROW_HASH_COLUMN: row_hash})
+    matched = current.merge(previous, on=['show_id', ROW_HASH_COLUMN], how='left')
+    return matched['position'].fillna(-1).to_numpy(dtype=np.int64)
+
+
+def iter_refreshed_chunks(csv_path, old, summary, chunksize=INGEST_CHUNKSIZE, executor=None):
+    previous = pd.DataFrame({
+        'show_id': old['show_id'].to_numpy(zero_copy_only=False),
+        ROW_HASH_COLUMN: old[ROW_HASH_COLUMN].to_numpy(),
+        'position': np.arange(old.num_rows),
+    }).drop_duplicates(['show_id', ROW_HASH_COLUMN])
+    old_ids = pd.Index(previous['show_id'].unique())
+    seen = np.zeros(len(old_ids), dtype=bool)
+
+    for chunk in iter_source_chunks(csv_path, chunksize):
+        row_hash = source_row_hash(chunk)
+        positions = match_rows(chunk, row_hash, previous)
+        stale = positions < 0
+        old_id_codes = old_ids.get_indexer(chunk['show_id'].to_numpy(dtype=object))
+        known = old_id_codes >= 0
+        seen[old_id_codes[known]] = True
+        summary['unchanged'] += int((~stale).sum())
+        summary['changed'] += int((stale & known).sum())
+        summary['added'] += int((stale & ~known).sum())
+
+        # Unchanged titles are copied from the previous artifact; only the rest
+        # go through parsing, feature engineering and sentiment scoring
+        parts = []
+        if (~stale).any():
+            kept = old.take(positions[~stale]).to_pandas()
+            kept.index = chunk.index[~stale]
+            parts.append(kept)
+        if stale.any():
+            fresh = engineer_features(chunk[stale].copy(), executor)
+            fresh[ROW_HASH_COLUMN] = row_hash[stale]
+            parts.append(fresh)
+        yield pd.concat(parts).sort_index() if len(parts) > 1 else parts[0]
+
+    summary['removed'] = int((~seen).sum())
+
+
+def refresh_dataset(csv_path=SOURCE_CSV, artifact_path=ARTIFACT_PATH, source_hash=None,
+                    chunksize=INGEST_CHUNKSIZE, previous_path=None):
+    # Diffs the source against the previous artifact (by default the one being
+    # replaced) by show_id and row hash, re-engineering only added and changed
+    # titles. Returns counts of added, changed, removed and unchanged titles.
+    if source_hash is None:
+        source_hash = file_hash(csv_path)
+    if previous_path is None:
+        previous_path = artifact_path
+    summary = {'added': 0, 'changed': 0, 'removed': 0, 'unchanged': 0}
+
+    old = None
+    if artifact_source_hash(previous_path) is not None:
+        old = read_artifact_table(previous_path)
+    if old is None or ROW_HASH_COLUMN not in old.schema.names:
+        summary['added'] = build_dataset(csv_path, artifact_path, source_hash, chunksize)
+        return summary
+
+    with sentiment.scoring_pool() as executor:
+        chunks = iter_refreshed_chunks(csv_path, old, summary, chunksize, executor)
+        write_artifact(chunks, artifact_path, source_hash, schema=old.schema)
+    return summary
+
+
+def artifact_source_hash(artifact_path=ARTIFACT_PATH):
+    if not os.path.exists(artifact_path):
+        return None
+    try:
+        with pa.memory_map(artifact_path) as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+    except pa.ArrowInvalid:
+        return None
+    value = metadata.get(SOURCE_HASH_KEY)
+    return value.decode() if value else None
+
+
+def read_artifact_table(artifact_path=ARTIFACT_PATH, columns=None):
+    # Arrow table backed by the memory map; columns are paged in only when touched
+    with pa.memory_map(artifact_path) as source:
+        table = pa.ipc.open_file(source).read_all()
+    if columns is not None:
+        table = table.select(columns)
+    return table
+
+
+def read_artifact(artifact_path=ARTIFACT_PATH, columns=None):
+    return read_artifact_table(artifact_path, columns).to_pandas()
+
+
+def dataset_columns(artifact_path=ARTIFACT_PATH):
+    # Title columns, without the artifact's bookkeeping columns
+    with pa.memory_map(artifact_path) as source:
+        names = pa.ipc.open_file(source).schema.names
+    return [name for name in names if name not in INTERNAL_COLUMNS]
+
+
+def resident_columns(artifact_path=ARTIFACT_PATH):
+    return [
+        name for name in dataset_columns(artifact_path)
+        if name not in TEXT_COLUMNS and name not in INDEXED_COLUMNS
+    ]
+
+
+def compact_frame(df):
+    return df.astype({col: dtype for col, dtype in COMPACT_DTYPES.items() if col in df.columns})
+
+
+def read_resident_frame(artifact_path=ARTIFACT_PATH):
+    # The per-title frame kept in memory: no long text, no list columns, compact dtypes
+    return compact_frame(read_artifact(artifact_path, columns=resident_columns(artifact_path)))
+
+
+def read_genre_index(artifact_path=ARTIFACT_PATH):
+    return MultiValueIndex.from_arrow(read_artifact_table(artifact_path, ['genres'])['genres'])
+
+
+def read_country_index(artifact_path=ARTIFACT_PATH):
+    # Every country a title lists, not just the first
+    return MultiValueIndex.from_dictionary(read_artifact_table(artifact_path, ['country'])['country'])
+
+
+def read_people_index(column, artifact_path=ARTIFACT_PATH):
+    names = read_artifact_table(artifact_path, [column])[column].to_pandas()
+    return MultiValueIndex.from_strings(names.where(names != MISSING_NAME, ''))
+
+
+def read_rows(row_ids, artifact_path=ARTIFACT_PATH, columns=None):
+    # Full rows for a selection, taken from the memory map without loading the rest
+    if columns is None:
+        columns = dataset_columns(artifact_path)
+    return read_artifact_table(artifact_path, columns).take(row_ids).to_pandas()
+
+
+def versioned_artifact_path(artifact_path, source_hash):
+    # netflix_titles.arrow -> netflix_titles.<source hash prefix>.arrow
+    root, ext = os.path.splitext(artifact_path)
+    return f"{root}.{source_hash[:VERSION_HASH_CHARS]}{ext}"
+
+
+def artifact_versions(artifact_path=ARTIFACT_PATH):
+    # Versioned artifacts written for artifact_path, newest first
+    root, ext = os.path.splitext(artifact_path)
+    directory = os.path.dirname(root) or '.'
+    version = rf'\.[0-9a-f]{{{VERSION_HASH_CHARS}}}'
+    pattern = re.compile(re.escape(os.path.basename(root)) + version + re.escape(ext) + '$')
+    paths = [os.path.join(directory, name) for name in os.listdir(directory) if pattern.match(name)]
+    return sorted(paths, key=os.path.getmtime, reverse=True)
+
+
+def ensure_artifact(csv_path=SOURCE_CSV, artifact_path=ARTIFACT_PATH, incremental=True):
+    # Brings the artifact for the current source CSV up to date and returns its
+    # source hash and path. Each source version is written to its own file next
+    # to artifact_path and never rewritten, so indexes, exports and row reads
+    # built from an older version keep reading that version's rows by path.
+    source_hash = file_hash(csv_path)
+    path = versioned_artifact_path(artifact_path, source_hash)
+    if artifact_source_hash(path) != source_hash:
+        if incremental:
+            # Diffed against the newest version, or an artifact built in place by main()
+            previous = artifact_versions(artifact_path) or [artifact_path]
+            refresh_dataset(csv_path, path, source_hash=source_hash, previous_path=previous[0])
+        else:
+            build_dataset(csv_path, path, source_hash=source_hash)
+        for old_path in artifact_versions(artifact_path)[KEEP_ARTIFACT_VERSIONS:]:
+            # Readers that still map an old file keep its pages until they drop the mapping
+            os.remove(old_path)
+    return source_hash, path
+
+
+def load_dataset(csv_path=SOURCE_CSV, artifact_path=ARTIFACT_PATH, columns=None):
+    _, path = ensure_artifact(csv_path, artifact_path)
+    return read_artifact(path, columns=columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the precomputed Netflix titles artifact")
+    parser.add_argument('--source', default=SOURCE_CSV, help="Source CSV path")
+    parser.add_argument('--output', default=ARTIFACT_PATH, help="Arrow IPC artifact path")
+    parser.add_argument('--force', action='store_true',
+                        help="Rebuild every row, even if the source hash is unchanged")
+    parser.add_argument('--chunksize', type=int, default=INGEST_CHUNKSIZE, help="Rows per ingestion chunk")
+    args = parser.parse_args()
+
+    source_hash = file_hash(args.source)
+    if not args.force and artifact_source_hash(args.output) == source_hash:
+        print(f"{args.output} is up to date ({source_hash[:12]})")
+        return
+    if args.force:
+        num_rows = build_dataset(args.source, args.output, source_hash=source_hash, chunksize=args.chunksize)
+        print(f"Wrote {num_rows} rows to {args.output} ({source_hash[:12]})")
+        return
+    summary = refresh_dataset(args.source, args.output, source_hash=source_hash, chunksize=args.chunksize)
+    print(
+        f"Refreshed {args.output} ({source_hash[:12]}): {summary['added']} added, "
+        f"{summary['changed']} changed, {summary['removed']} removed, {summary['unchanged']} unchanged"
+    )
+
+
+if __name__ == '__main__':
+    main()
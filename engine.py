@@ -0,0 +1,205 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from aggregations import Selection, TAB_AGGREGATIONS
+from cube import COUNTRY_DIM, CUBE_DIMS, GENRE_DIM, SET_SOURCES, CountCube
+from data_store import (
+    ARTIFACT_PATH, SOURCE_CSV, ensure_artifact, read_artifact_table, read_country_index,
+    read_genre_index, read_resident_frame, read_rows
+)
+from filters import FilterCache, FilterState, cached_select_rows, normalize_state
+from forecast import FORECAST_HORIZON, Forecaster, selection_series
+from search_index import SEARCH_FIELDS, SearchIndex
+from shared_store import Dataset, attach_resident_frame, current_dataset
+
+# Measures other than 'count' are written 'function:column', e.g. 'mean:duration_minutes'
+MEASURE_FUNCTIONS = ('sum', 'mean', 'min', 'max', 'nunique')
+
+
+class AnalyticsEngine:
+    # Everything the dashboard computes for one dataset version: the resident frame,
+    # its indexes and the caches in front of them, loaded once and shared by every
+    # caller in the process. Selections are filtered rows; aggregations and tab
+    # results are computed from them.
+    def __init__(self, dataset, filter_cache_size=256, tab_cache_size=512, ttl=3600):
+        self.dataset = dataset
+        # A published dataset is attached zero-copy from the shared mapping
+        if dataset.resident_path:
+            self.data = attach_resident_frame(dataset.resident_path)
+        else:
+            self.data = read_resident_frame(dataset.artifact_path)
+        self.genre_index = read_genre_index(dataset.artifact_path)
+        self.country_index = read_country_index(dataset.artifact_path)
+        self.set_indexes = {GENRE_DIM: self.genre_index, COUNTRY_DIM: self.country_index}
+        self.cube = CountCube(self.data, self.set_indexes)
+        self.search_index = SearchIndex(read_artifact_table(dataset.artifact_path, SEARCH_FIELDS), SEARCH_FIELDS)
+        self.filter_cache = FilterCache(maxsize=filter_cache_size, ttl=ttl)
+        self.tab_cache = FilterCache(maxsize=tab_cache_size, ttl=ttl)
+        self.forecaster = Forecaster(ttl=ttl)
+        self._people = None
+        self._people_lock = threading.Lock()
+        self._recommender = None
+        self._recommender_lock = threading.Lock()
+
+    @property
+    def people(self):
+        # Cast and director index, built the first time people analytics are asked for
+        with self._people_lock:
+            if self._people is None:
+                # scipy is imported only with it
+                from people import PeopleIndex
+                self._people = PeopleIndex.from_artifact(self.data, self.dataset.artifact_path)
+            return self._people
+
+    @property
+    def recommender(self):
+        # Content similarity vectors, built the first time recommendations are asked for
+        with self._recommender_lock:
+            if self._recommender is None:
+                from recommender import Recommender
+                self._recommender = Recommender.from_artifact(self.data, self.genre_index,
+                                                              self.dataset.artifact_path)
+            return self._recommender
+
+    def default_state(self):
+        # Every title: all years, countries, types and genres
+        years = self.data['year_added'].dropna()
+        year_range = (int(years.min()), int(years.max())) if len(years) else (0, 0)
+        return FilterState(year_range, [], 'All', [], '')
+
+    def filter(self, state):
+        state = normalize_state(state)
+        row_ids = cached_select_rows(self.data, state, self.genre_index, self.filter_cache,
+                                     self.search_index, self.country_index)
+        return Selection(self.data, row_ids, state, self.cube)
+
+    def aggregate(self, selection, dims, measure='count'):
+        # measure per combination of dims over the selection, as a Series indexed by dims
+        dims = list(dims)
+        if measure == 'count':
+            unknown = [dim for dim in dims if dim not in CUBE_DIMS and dim not in SET_SOURCES]
+            if unknown:
+                raise ValueError(f"cannot count by {unknown}; dimensions are {CUBE_DIMS + list(SET_SOURCES)}")
+            if not dims:
+                return pd.Series([len(selection.row_ids)], name='count')
+            return selection.count_by(*dims)
+
+        function, _, column = measure.partition(':')
+        if function not in MEASURE_FUNCTIONS or column not in self.data.columns:
+            raise ValueError(f"unknown measure {measure!r}")
+        unknown = [dim for dim in dims if dim not in self.data.columns and dim not in SET_SOURCES]
+        if unknown:
+            raise ValueError(f"unknown dimensions {unknown}")
+        set_dims = [dim for dim in dims if dim in SET_SOURCES]
+        if len(set_dims) > 1:
+            raise ValueError(f"measures group by at most one of {list(SET_SOURCES)}")
+        frame = self.data
+        rows = selection.row_ids
+        columns = [dim for dim in dims if dim not in SET_SOURCES] + [column]
+        if set_dims:
+            # One row per (title, genre) or (title, country) pair
+            index = self.set_indexes[set_dims[0]]
+            rows, codes = index.entries(rows)
+            frame = frame.iloc[rows][list(dict.fromkeys(columns))].reset_index(drop=True)
+            frame[set_dims[0]] = index.labels[codes]
+        else:
+            frame = frame.iloc[rows][list(dict.fromkeys(columns))]
+        if not dims:
+            return pd.Series([frame[column].agg(function)], name=measure)
+        return frame.groupby(dims, observed=True, sort=True)[column].agg(function).rename(measure)
+
+    def _cached(self, key, compute, *args):
+        result = self.tab_cache.get(key)
+        if result is None:
+            result = compute(*args)
+            self.tab_cache.put(key, result)
+        return result
+
+    def tab(self, selection, tab):
+        # The tables one dashboard tab draws, cached per filter state
+        return self._cached((tab, selection.state), TAB_AGGREGATIONS[tab], selection)
+
+    def people_tables(self, selection, n=15):
+        # Most credited people and strongest collaborations among the selected titles
+        def compute():
+            rows = selection.row_ids
+            people = self.people
+            return {
+                'prolific_actors': people.prolific('actor', rows, n),
+                'prolific_directors': people.prolific('director', rows, n),
+                'actor_pairs': people.top_pairs('actor', rows, n),
+                'director_pairs': people.top_pairs('director', rows, n),
+            }
+        return self._cached(('people', n, selection.state), compute)
+
+    def collaborators(self, selection, role, name, n=15):
+        return self._cached(('collaborators', role, name, n, selection.state),
+                            self.people.collaborators, role, name, selection.row_ids, n)
+
+    def _recommendations(self, found):
+        rows, scores = found
+        result = self.data.iloc[rows][['show_id', 'title', 'type', 'primary_country', 'release_year']]
+        return result.assign(similarity=scores).reset_index(drop=True)
+
+    def recommend(self, selection, k=10):
+        # Titles outside the selection most like it as a whole
+        def compute():
+            return self._recommendations(self.recommender.like_selection(selection.row_ids, k))
+        return self._cached(('recommend', k, selection.state), compute)
+
+    def row_of(self, show_id):
+        rows = np.flatnonzero(self.data['show_id'].to_numpy() == show_id)
+        if not len(rows):
+            raise KeyError(f"no title with show_id {show_id!r}")
+        return int(rows[0])
+
+    def similar_titles(self, row_id, k=10):
+        # Titles most like one title, anywhere in the catalog
+        def compute():
+            return self._recommendations(self.recommender.like_titles([row_id], k)[0])
+        return self._cached(('similar', k, row_id), compute)
+
+    def forecasts(self, selection, horizon=FORECAST_HORIZON):
+        # Monthly additions per type, genre and country, with their projections
+        def compute():
+            return self.forecaster.forecast(selection_series(selection), horizon)
+        return self._cached(('forecast', horizon, selection.state), compute)
+
+    def rows(self, selection, columns=None, offset=0, limit=None):
+        # Full title rows of the selection, read from the artifact
+        stop = None if limit is None else offset + limit
+        return read_rows(selection.row_ids[offset:stop], self.dataset.artifact_path, columns)
+
+
+class EngineHolder:
+    # The engine for the current dataset version, rebuilt when a new version appears:
+    # published into shared_dir by shared_store.py, or refreshed from the source CSV
+    def __init__(self, shared_dir=None, csv_path=SOURCE_CSV, artifact_path=ARTIFACT_PATH):
+        self.shared_dir = shared_dir
+        self.csv_path = csv_path
+        self.artifact_path = artifact_path
+        self._source_stat = None
+        self._dataset = None
+        self._engine = None
+        self._lock = threading.Lock()
+
+    def current_dataset(self):
+        if self.shared_dir:
+            return current_dataset(self.shared_dir)
+        # The source is only re-hashed when its size or modification time changes
+        stat = os.stat(self.csv_path)
+        if (stat.st_mtime_ns, stat.st_size) != self._source_stat:
+            version, artifact_path = ensure_artifact(self.csv_path, self.artifact_path)
+            self._dataset = Dataset(version, artifact_path, None)
+            self._source_stat = (stat.st_mtime_ns, stat.st_size)
+        return self._dataset
+
+    def engine(self):
+        with self._lock:
+            dataset = self.current_dataset()
+            if self._engine is None or self._engine.dataset != dataset:
+                self._engine = AnalyticsEngine(dataset)
+            return self._engine
@@ -0,0 +1,113 @@
+import gzip
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict, namedtuple
+
+import pyarrow.parquet as pq
+
+from data_store import ARTIFACT_PATH, dataset_columns, read_artifact_table
+
+ExportFormat = namedtuple('ExportFormat', ['label', 'extension', 'mime'])
+
+EXPORT_FORMATS = {
+    'csv': ExportFormat('CSV', 'csv', 'text/csv'),
+    'csv.gz': ExportFormat('CSV (gzip)', 'csv.gz', 'application/gzip'),
+    'parquet': ExportFormat('Parquet', 'parquet', 'application/vnd.apache.parquet'),
+}
+
+# Rows taken from the artifact and serialized per step, bounding memory while exporting
+EXPORT_CHUNK_ROWS = 50_000
+
+
+def iter_export_chunks(row_ids, artifact_path=ARTIFACT_PATH, chunk_rows=EXPORT_CHUNK_ROWS):
+    table = read_artifact_table(artifact_path, dataset_columns(artifact_path))
+    if not len(row_ids):
+        yield table.slice(0, 0)
+    for start in range(0, len(row_ids), chunk_rows):
+        yield table.take(row_ids[start:start + chunk_rows])
+
+
+def write_csv(chunks, sink):
+    for i, chunk in enumerate(chunks):
+        frame = chunk.to_pandas()
+        # Genres as a list literal, as in the frame the dashboard used to export
+        frame['genres'] = frame['genres'].map(list)
+        sink.write(frame.to_csv(index=False, header=i == 0).encode('utf-8'))
+
+
+def write_csv_gzip(chunks, sink):
+    with gzip.GzipFile(fileobj=sink, mode='wb') as compressed:
+        write_csv(chunks, compressed)
+
+
+def write_parquet(chunks, sink):
+    writer = None
+    try:
+        for chunk in chunks:
+            if writer is None:
+                writer = pq.ParquetWriter(sink, chunk.schema)
+            writer.write_table(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+WRITERS = {'csv': write_csv, 'csv.gz': write_csv_gzip, 'parquet': write_parquet}
+
+
+class ExportService:
+    # Serializes a selection only when it is downloaded, chunk by chunk into a file
+    # on disk, and keeps the most recent files so repeat downloads cost nothing
+    def __init__(self, artifact_path=ARTIFACT_PATH, max_exports=32, chunk_rows=EXPORT_CHUNK_ROWS):
+        self.artifact_path = artifact_path
+        self.max_exports = max_exports
+        self.chunk_rows = chunk_rows
+        self.directory = tempfile.mkdtemp(prefix='netflix-export-')
+        self.hits = 0
+        self.misses = 0
+        self._files = OrderedDict()
+        self._lock = threading.Lock()
+        weakref.finalize(self, shutil.rmtree, self.directory, ignore_errors=True)
+
+    def export(self, key, row_ids, fmt='csv'):
+        # Path of the exported file for (key, fmt), writing it on a cache miss
+        cache_key = (key, fmt)
+        with self._lock:
+            path = self._files.get(cache_key)
+            if path is not None and os.path.exists(path):
+                self._files.move_to_end(cache_key)
+                self.hits += 1
+                return path
+            self.misses += 1
+
+        digest = hashlib.sha1(repr(cache_key).encode()).hexdigest()
+        path = os.path.join(self.directory, f"{digest}.{EXPORT_FORMATS[fmt].extension}")
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as sink:
+                WRITERS[fmt](iter_export_chunks(row_ids, self.artifact_path, self.chunk_rows), sink)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            self._files[cache_key] = path
+            self._files.move_to_end(cache_key)
+            while len(self._files) > self.max_exports:
+                _, evicted = self._files.popitem(last=False)
+                if os.path.exists(evicted):
+                    os.remove(evicted)
+        return path
+
+    def read(self, key, row_ids, fmt='csv'):
+        with open(self.export(key, row_ids, fmt), 'rb') as f:
+            return f.read()
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._files)}
@@ -0,0 +1,106 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+FilterState = namedtuple(
+    'FilterState',
+    ['year_range', 'countries', 'content_type', 'genres', 'search_query', 'search_fields', 'all_countries'],
+    defaults=(('title',), False)
+)
+
+
+def filter_mask(data, state, genre_index, search_index=None, country_index=None):
+    # All predicates combined into one boolean mask over the shared frame
+    year = data['year_added'].to_numpy(dtype=float, na_value=np.nan)
+    mask = (year >= state.year_range[0]) & (year <= state.year_range[1])
+
+    # Co-productions match on any listed country when the state asks for all of them
+    if state.countries and state.all_countries:
+        mask &= country_index.mask(state.countries)
+    elif state.countries:
+        mask &= data['primary_country'].isin(state.countries).to_numpy()
+
+    if state.content_type != 'All':
+        mask &= (data['type'] == state.content_type).to_numpy()
+
+    if state.genres:
+        mask &= genre_index.mask(state.genres)
+
+    if state.search_query and search_index is not None:
+        mask &= search_index.mask(state.search_query, state.search_fields)
+    # Without an index the title scan is the costliest predicate, so it only runs on rows still selected
+    elif state.search_query:
+        candidates = np.flatnonzero(mask)
+        titles = data['title'].take(candidates)
+        hits = titles.str.contains(state.search_query, case=False, na=False).to_numpy()
+        mask[candidates[~hits]] = False
+
+    return mask
+
+
+def select_rows(data, state, genre_index, search_index=None, country_index=None):
+    return np.flatnonzero(filter_mask(data, state, genre_index, search_index, country_index))
+
+
+def normalize_state(state):
+    # Canonical form so equivalent widget selections share a cache entry
+    return FilterState(
+        (int(state.year_range[0]), int(state.year_range[1])),
+        tuple(sorted(state.countries)),
+        state.content_type,
+        tuple(sorted(state.genres)),
+        state.search_query,
+        tuple(sorted(state.search_fields)),
+        bool(state.all_countries),
+    )
+
+
+class FilterCache:
+    # Bounded LRU of row-id selections with a time-to-live, safe to share across sessions
+    def __init__(self, maxsize=256, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+
+def cached_select_rows(data, state, genre_index, cache, search_index=None, country_index=None):
+    key = normalize_state(state)
+    row_ids = cache.get(key)
+    if row_ids is None:
+        row_ids = select_rows(data, key, genre_index, search_index, country_index)
+        # Shared between sessions, so callers must not modify it
+        row_ids.flags.writeable = False
+        cache.put(key, row_ids)
+    return row_ids
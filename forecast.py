@@ -0,0 +1,161 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from cube import GENRE_DIM
+from filters import FilterCache
+
+# Months projected past the last month with additions, by default and at most
+FORECAST_HORIZON = 12
+MAX_FORECAST_HORIZON = 60
+
+# Damped-trend exponential smoothing (damped Holt) parameters tried for every
+# series; each series keeps the combination with the lowest one-step-ahead error
+ALPHAS = np.linspace(0.05, 0.95, 10)
+BETAS = np.array([0.01, 0.05, 0.1, 0.2, 0.3])
+PHIS = np.array([0.8, 0.9, 0.98])
+
+# Leading months whose one-step errors only reflect the starting values
+WARMUP_MONTHS = 3
+
+# Two-sided 95% band around each projection
+Z_95 = 1.96
+
+
+def month_numbers(counts):
+    # Months since year 0 of a Series indexed by (year_added, month_added, ...)
+    years = counts.index.get_level_values(0).to_numpy(dtype=float, na_value=np.nan)
+    months = counts.index.get_level_values(1).to_numpy(dtype=float, na_value=np.nan)
+    return years * 12 + months - 1
+
+
+def monthly_matrix(counts, first, n_months):
+    # counts is a Series indexed by (year_added, month_added, key); returns the
+    # keys and a keys x n_months array of additions from month number first on
+    numbers = month_numbers(counts)
+    dated = ~np.isnan(numbers)
+    keys, key_codes = np.unique(counts.index.get_level_values(2).to_numpy(dtype=object)[dated],
+                                return_inverse=True)
+    values = np.zeros((len(keys), n_months))
+    np.add.at(values, (key_codes, numbers[dated].astype(int) - first), counts.to_numpy(dtype=float)[dated])
+    return list(keys), values
+
+
+def fit_holt(values):
+    # Fits every row of values at once: the recursion runs over months, vectorized
+    # over series x parameter combinations. Returns per-series parameters, final
+    # level and trend, and the RMSE of the one-step-ahead errors.
+    alphas, betas, phis = (a.ravel() for a in np.meshgrid(ALPHAS, BETAS, PHIS, indexing='ij'))
+    n_series, n_months = values.shape
+    level = np.repeat(values[:, :1], len(alphas), axis=1)
+    trend = np.zeros_like(level)
+    if n_months > 1:
+        trend += (values[:, 1:2] - values[:, :1])
+    sse = np.zeros_like(level)
+    for t in range(1, n_months):
+        y = values[:, t:t + 1]
+        predicted = level + phis * trend
+        if t >= WARMUP_MONTHS:
+            sse += (y - predicted) ** 2
+        new_level = alphas * y + (1 - alphas) * predicted
+        trend = betas * (new_level - level) + (1 - betas) * phis * trend
+        level = new_level
+
+    best = np.argmin(sse, axis=1)
+    rows = np.arange(n_series)
+    errors = max(n_months - WARMUP_MONTHS, 1)
+    return {
+        'alpha': alphas[best],
+        'beta': betas[best],
+        'phi': phis[best],
+        'level': level[rows, best],
+        'trend': trend[rows, best],
+        'rmse': np.sqrt(sse[rows, best] / errors),
+    }
+
+
+def project(fits, horizon):
+    # keys x horizon projections, with a band that widens with the horizon
+    steps = np.arange(1, horizon + 1)
+    damping = np.cumsum(fits['phi'][:, None] ** steps, axis=1)
+    forecast = np.maximum(fits['level'][:, None] + damping * fits['trend'][:, None], 0)
+    spread = Z_95 * fits['rmse'][:, None] * np.sqrt(steps)
+    return forecast, np.maximum(forecast - spread, 0), forecast + spread
+
+
+class Forecaster:
+    # Monthly additions per series, projected by damped Holt smoothing. Fits are
+    # cached per series key and history, so series that did not change between
+    # filter states (or callers) are not refit; the rest are fit in one batch.
+    def __init__(self, cache_size=4096, ttl=3600):
+        self.cache = FilterCache(maxsize=cache_size, ttl=ttl)
+
+    def fits(self, keys, values):
+        fits = [None] * len(keys)
+        cache_keys = []
+        for i, key in enumerate(keys):
+            digest = hashlib.blake2b(np.ascontiguousarray(values[i]).tobytes(), digest_size=16).digest()
+            cache_keys.append((key, values.shape[1], digest))
+            fits[i] = self.cache.get(cache_keys[i])
+        missing = [i for i, fit in enumerate(fits) if fit is None]
+        if missing:
+            batch = fit_holt(values[missing])
+            for j, i in enumerate(missing):
+                fits[i] = {name: column[j] for name, column in batch.items()}
+                self.cache.put(cache_keys[i], fits[i])
+        return {name: np.array([fit[name] for fit in fits]) for name in fits[0]} if fits else {}
+
+    def forecast(self, series, horizon=FORECAST_HORIZON):
+        # series maps a dimension name to its (year_added, month_added, value)
+        # counts. Every dimension's series are fit together; returns per dimension
+        # a long frame of month, series, additions and kind (history or forecast),
+        # with lower and upper bounds on the forecast rows.
+        numbers = np.concatenate([month_numbers(counts) for counts in series.values()])
+        numbers = numbers[~np.isnan(numbers)].astype(int)
+        if not len(numbers):
+            return {dim: _empty_frame() for dim in series}
+        first, n_months = numbers.min(), numbers.max() - numbers.min() + 1
+        matrices = {dim: monthly_matrix(counts, first, n_months) for dim, counts in series.items()}
+        keys = [(dim, key) for dim, (dim_keys, _) in matrices.items() for key in dim_keys]
+        values = np.vstack([values for _, values in matrices.values()])
+        fits = self.fits(keys, values)
+        forecast, lower, upper = project(fits, horizon)
+        months = pd.date_range(f'{first // 12}-{first % 12 + 1:02d}-01', periods=n_months + horizon, freq='MS')
+        history_months, future = months[:n_months], months[n_months:]
+
+        result = {}
+        start = 0
+        for dim, (dim_keys, _) in matrices.items():
+            stop = start + len(dim_keys)
+            labels = np.asarray(dim_keys, dtype=object)
+            history = pd.DataFrame({
+                'month': np.tile(history_months, len(labels)),
+                'series': np.repeat(labels, n_months),
+                'additions': values[start:stop].ravel(),
+                'kind': 'history',
+            })
+            projected = pd.DataFrame({
+                'month': np.tile(future, len(labels)),
+                'series': np.repeat(labels, horizon),
+                'additions': forecast[start:stop].ravel(),
+                'kind': 'forecast',
+                'lower': lower[start:stop].ravel(),
+                'upper': upper[start:stop].ravel(),
+            })
+            result[dim] = pd.concat([history, projected], ignore_index=True)
+            start = stop
+        return result
+
+
+def _empty_frame():
+    return pd.DataFrame({'month': [], 'series': [], 'additions': [], 'kind': [], 'lower': [], 'upper': []})
+
+
+def selection_series(sel):
+    # Monthly additions of the selection per type, genre and country
+    return {
+        'type': sel.count_by('year_added', 'month_added', 'type'),
+        'genre': sel.count_by('year_added', 'month_added', GENRE_DIM),
+        'country': sel.count_by('year_added', 'month_added', sel.country_dim),
+    }
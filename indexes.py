@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+
+class MultiValueIndex:
+    # Integer-coded CSR of a multi-valued column: row i holds codes[offsets[i]:offsets[i + 1]],
+    # plus label -> row-id posting lists for membership tests
+    def __init__(self, offsets, codes, labels):
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.codes = np.asarray(codes, dtype=np.int32)
+        self.labels = np.asarray(labels, dtype=object)
+        self.n_rows = len(self.offsets) - 1
+        self.label_codes = {label: code for code, label in enumerate(self.labels)}
+
+        # Row id of every entry, and the entries grouped by label
+        self.entry_rows = np.repeat(np.arange(self.n_rows, dtype=np.int32), np.diff(self.offsets))
+        order = np.argsort(self.codes, kind='stable')
+        self.posting_rows = self.entry_rows[order]
+        self.posting_offsets = np.zeros(len(self.labels) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.codes, minlength=len(self.labels)), out=self.posting_offsets[1:])
+
+    @classmethod
+    def from_exploded(cls, flat, n_rows):
+        # flat holds one value per entry, indexed by row position
+        flat = flat[flat.notna() & (flat != '')]
+        codes, labels = pd.factorize(flat, sort=True)
+        offsets = np.zeros(n_rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(flat.index.to_numpy(dtype=np.int64), minlength=n_rows), out=offsets[1:])
+        return cls(offsets, codes, labels)
+
+    @classmethod
+    def from_lists(cls, values):
+        values = pd.Series(values).reset_index(drop=True)
+        return cls.from_exploded(values.explode(), len(values))
+
+    @classmethod
+    def from_strings(cls, values, sep=','):
+        values = pd.Series(values).reset_index(drop=True).astype(object)
+        return cls.from_exploded(values.str.split(sep).explode().str.strip(), len(values))
+
+    @classmethod
+    def from_arrow(cls, values):
+        # values is an Arrow list<string> column; entries are read from its flat
+        # child array instead of materializing a Python list per row
+        if isinstance(values, pa.ChunkedArray):
+            values = values.combine_chunks()
+        offsets = values.offsets.to_numpy()
+        rows = np.repeat(np.arange(len(values)), np.diff(offsets))
+        flat = pd.Series(values.flatten().to_pandas().to_numpy(), index=rows)
+        return cls.from_exploded(flat, len(values))
+
+    @classmethod
+    def from_dictionary(cls, values, sep=','):
+        # values is a dictionary-encoded Arrow column of separated strings: each
+        # distinct string is split once and its codes repeated for the rows holding it
+        if isinstance(values, pa.ChunkedArray):
+            values = values.unify_dictionaries().combine_chunks()
+        distinct = cls.from_strings(values.dictionary.to_pandas(), sep)
+        return distinct.take(values.indices.to_numpy(zero_copy_only=False))
+
+    def __len__(self):
+        return self.n_rows
+
+    @property
+    def nbytes(self):
+        arrays = [self.offsets, self.codes, self.entry_rows, self.posting_rows, self.posting_offsets]
+        labels = pd.Series(self.labels).memory_usage(index=False, deep=True)
+        return sum(a.nbytes for a in arrays) + int(labels)
+
+    def codes_for(self, labels):
+        return np.array([self.label_codes[l] for l in labels if l in self.label_codes], dtype=np.int64)
+
+    def postings(self, label):
+        code = self.label_codes.get(label)
+        if code is None:
+            return self.posting_rows[:0]
+        return self.posting_rows[self.posting_offsets[code]:self.posting_offsets[code + 1]]
+
+    def mask(self, labels):
+        # Rows holding any of the labels: an OR over the labels' posting lists
+        mask = np.zeros(self.n_rows, dtype=bool)
+        for label in labels:
+            mask[self.postings(label)] = True
+        return mask
+
+    def entries(self, rows=None):
+        # (row id, code) pairs for the selected rows, in row order
+        if rows is None:
+            return self.entry_rows, self.codes
+        row_mask = np.zeros(self.n_rows, dtype=bool)
+        row_mask[rows] = True
+        keep = row_mask[self.entry_rows]
+        return self.entry_rows[keep], self.codes[keep]
+
+    def counts(self, rows=None):
+        # Like value_counts() on the exploded column: descending, ties in order of first appearance
+        _, codes = self.entries(rows)
+        present, first_seen, counts = np.unique(codes, return_index=True, return_counts=True)
+        order = np.lexsort((first_seen, -counts))
+        return pd.Series(counts[order], index=pd.Index(self.labels[present[order]]), name='count')
+
+    def take(self, rows):
+        # The index of the given rows, in that order, over the same labels
+        starts = self.offsets[rows]
+        lengths = self.offsets[np.asarray(rows) + 1] - starts
+        return MultiValueIndex(np.r_[0, np.cumsum(lengths)], self.codes[concat_ranges(starts, lengths)], self.labels)
+
+    def incidence(self, dtype=np.int32):
+        # rows x labels SciPy CSR with a 1 where the row holds the label; it shares
+        # the index's layout, so slicing matrix rows selects rows of the index
+        import scipy.sparse as sp
+
+        matrix = sp.csr_matrix(
+            (np.ones(len(self.codes), dtype=dtype), self.codes, self.offsets),
+            shape=(self.n_rows, len(self.labels))
+        )
+        matrix.sum_duplicates()
+        matrix.data[:] = 1
+        return matrix
+
+    def long_frame(self, name, rows=None, columns=None):
+        # One row per (title, label) for the selected rows, carrying only the
+        # requested per-title columns instead of exploding the whole frame
+        entry_rows, codes = self.entries(rows)
+        data = {name: self.labels[codes]}
+        for col, values in (columns or {}).items():
+            data[col] = np.asarray(values)[entry_rows]
+        return pd.DataFrame(data)
+
+
+def concat_ranges(starts, lengths):
+    # Concatenation of arange(start, start + length) for each pair, without a Python loop
+    total = int(lengths.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    ends = np.cumsum(lengths)
+    offsets = np.repeat(ends - lengths, lengths)
+    return np.repeat(starts, lengths) + (np.arange(total) - offsets)
@@ -0,0 +1,175 @@
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Timing spans for the dashboard's hot paths. A Recorder collects the spans of
+# one script run; finished runs are folded into process-wide Metrics, which a
+# scrape endpoint serves in the Prometheus text format, and can be written as
+# one JSON line per run. A disabled Recorder hands out a shared no-op span, so
+# instrumented code costs one attribute check when nobody is looking.
+
+METRICS_PORT_ENV = 'NETFLIX_METRICS_PORT'
+TIMINGS_LOG_ENV = 'NETFLIX_TIMINGS_LOG'
+
+logger = logging.getLogger('netflix_dashboard.timings')
+
+try:
+    _PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+def rss_bytes():
+    # Resident set size of this process; 0 where /proc is not available
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('recorder', 'record', 'start', 'rss')
+
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.record = {'name': name, 'depth': recorder.depth, 'ms': None, 'rss_delta': 0}
+
+    def __enter__(self):
+        self.recorder.spans.append(self.record)
+        self.recorder.depth += 1
+        self.rss = rss_bytes()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.record['ms'] = (time.perf_counter() - self.start) * 1000
+        self.record['rss_delta'] = rss_bytes() - self.rss
+        self.recorder.depth -= 1
+        return False
+
+
+class Recorder:
+    # Spans of one run in the order they started, with their nesting depth
+    def __init__(self, enabled=False, metrics=None):
+        self.enabled = enabled
+        self.metrics = metrics
+        self.spans = []
+        self.depth = 0
+        self.start = time.perf_counter()
+        self.rss = rss_bytes() if enabled else 0
+
+    def span(self, name):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def finish(self):
+        # Totals for the run; records it into the metrics and the timings log
+        if not self.enabled:
+            return None
+        rss = rss_bytes()
+        run = {
+            'timestamp': time.time(),
+            'total_ms': (time.perf_counter() - self.start) * 1000,
+            'rss': rss,
+            'rss_delta': rss - self.rss,
+            'spans': [s for s in self.spans if s['ms'] is not None],
+        }
+        if self.metrics is not None:
+            self.metrics.observe_run(run)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps(run, default=float))
+        return run
+
+
+class Metrics:
+    # Count, total and maximum seconds per span name since the process started
+    def __init__(self):
+        self.runs = 0
+        self.spans = {}
+        self.rss = 0
+        self._lock = threading.Lock()
+
+    def observe_run(self, run):
+        with self._lock:
+            self.runs += 1
+            self.rss = run['rss']
+            for span in [{'name': 'run', 'ms': run['total_ms']}] + run['spans']:
+                seconds = span['ms'] / 1000
+                stats = self.spans.setdefault(span['name'], [0, 0.0, 0.0])
+                stats[0] += 1
+                stats[1] += seconds
+                stats[2] = max(stats[2], seconds)
+
+    def render(self):
+        with self._lock:
+            lines = [
+                '# HELP dashboard_runs_total Instrumented script runs.',
+                '# TYPE dashboard_runs_total counter',
+                f'dashboard_runs_total {self.runs}',
+                '# HELP dashboard_resident_bytes Resident set size after the last run.',
+                '# TYPE dashboard_resident_bytes gauge',
+                f'dashboard_resident_bytes {self.rss}',
+            ]
+            series = [
+                ('dashboard_spans_total', 'counter', 'Completed spans.', 0),
+                ('dashboard_span_seconds_total', 'counter', 'Seconds spent in spans.', 1),
+                ('dashboard_span_seconds_max', 'gauge', 'Longest span in seconds.', 2),
+            ]
+            for metric, kind, help_text, field in series:
+                lines.append(f'# HELP {metric} {help_text}')
+                lines.append(f'# TYPE {metric} {kind}')
+                for name, stats in sorted(self.spans.items()):
+                    label = name.replace('\\', '\\\\').replace('"', '\\"')
+                    lines.append(f'{metric}{{span="{label}"}} {stats[field]:.6g}')
+        return '\n'.join(lines) + '\n'
+
+
+METRICS = Metrics()
+
+
+def serve_metrics(port, metrics=METRICS, host='0.0.0.0'):
+    # Serves GET /metrics from a daemon thread; returns the server
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = metrics.render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+    return server
+
+
+def log_to_file(path):
+    # Appends one JSON line per run to path
+    handler = logging.FileHandler(path)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return handler
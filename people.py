@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from data_store import ARTIFACT_PATH, read_people_index
+
+ROLES = {'actor': 'cast', 'director': 'director'}
+
+
+class PeopleIndex:
+    # Who appears on which titles, and who appears with whom. Per role, a person ->
+    # title posting list (the MultiValueIndex) and a titles x people incidence
+    # matrix; over the whole catalog, actor x actor and director x actor counts of
+    # shared titles. A filtered selection slices the incidence rows of its titles.
+    def __init__(self, cast, directors, year, country):
+        self.indexes = {'actor': cast, 'director': directors}
+        self.incidence = {role: index.incidence() for role, index in self.indexes.items()}
+        self.year = np.asarray(year)
+        self.country = np.asarray(country)
+        self.n_rows = cast.n_rows
+
+        actors = self.incidence['actor']
+        co_actors = (actors.T @ actors).tocsr()
+        co_actors.setdiag(0)
+        co_actors.eliminate_zeros()
+        self.cooccurrence = {
+            ('actor', 'actor'): co_actors,
+            ('director', 'actor'): (self.incidence['director'].T @ actors).tocsr(),
+        }
+
+    @classmethod
+    def from_artifact(cls, data, artifact_path=ARTIFACT_PATH):
+        return cls(
+            read_people_index(ROLES['actor'], artifact_path),
+            read_people_index(ROLES['director'], artifact_path),
+            data['year_added'].to_numpy(dtype=float, na_value=np.nan),
+            data['primary_country'].to_numpy(dtype=object),
+        )
+
+    @property
+    def nbytes(self):
+        matrices = list(self.incidence.values()) + list(self.cooccurrence.values())
+        arrays = [a for m in matrices for a in (m.data, m.indices, m.indptr)]
+        return sum(a.nbytes for a in arrays) + sum(i.nbytes for i in self.indexes.values())
+
+    def _is_everything(self, rows):
+        return rows is None or len(rows) == self.n_rows
+
+    def prolific(self, role, rows=None, n=15):
+        # People credited on the most selected titles
+        return self.indexes[role].counts(rows).head(n).rename('titles')
+
+    def collaborators(self, role, name, rows=None, n=15):
+        # Actors sharing the most selected titles with one person
+        index = self.indexes[role]
+        code = index.label_codes.get(name)
+        if code is None:
+            return pd.Series([], dtype=np.int64, name='titles')
+        if self._is_everything(rows):
+            row = self.cooccurrence[(role, 'actor')][code]
+            codes, shared = row.indices, row.data
+        else:
+            titles = np.intersect1d(index.postings(name), rows)
+            shared = np.asarray(self.incidence['actor'][titles].sum(axis=0)).ravel()
+            codes = np.flatnonzero(shared)
+            shared = shared[codes]
+        # Nobody is their own collaborator, as with a director who acts in their own film
+        own_code = self.indexes['actor'].label_codes.get(name)
+        if own_code is not None:
+            keep = codes != own_code
+            codes, shared = codes[keep], shared[keep]
+        order = np.lexsort((codes, -shared))[:n]
+        labels = self.indexes['actor'].labels
+        return pd.Series(shared[order].astype(np.int64), index=pd.Index(labels[codes[order]], name='actor'),
+                         name='titles')
+
+    def top_pairs(self, role, rows=None, n=15):
+        # The (role, actor) pairs sharing the most selected titles, with the years
+        # and countries those titles span
+        if self._is_everything(rows):
+            matrix = self.cooccurrence[(role, 'actor')]
+        else:
+            selected = self.incidence[role][rows]
+            matrix = (selected.T @ self.incidence['actor'][rows]).tocsr()
+        if role == 'actor':
+            # Each actor pair appears twice in the symmetric matrix, and on the diagonal
+            matrix = sp.triu(matrix, k=1)
+        matrix = matrix.tocoo()
+        firsts = self.indexes[role].labels[matrix.row]
+        seconds = self.indexes['actor'].labels[matrix.col]
+        # A director who also acts in their own film is not a collaboration
+        keep = np.flatnonzero(firsts != seconds)
+        order = keep[np.lexsort((matrix.col[keep], matrix.row[keep], -matrix.data[keep]))][:n]
+
+        records = []
+        for i in order:
+            titles = np.intersect1d(self.indexes[role].postings(firsts[i]),
+                                    self.indexes['actor'].postings(seconds[i]))
+            if rows is not None:
+                titles = np.intersect1d(titles, rows)
+            years = self.year[titles]
+            years = years[~np.isnan(years)]
+            records.append({
+                role: firsts[i],
+                'actor' if role == 'director' else 'co-star': seconds[i],
+                'titles': int(matrix.data[i]),
+                'years': _year_span(years),
+                'countries': len(set(self.country[titles]) - {'Unknown'}),
+            })
+        return pd.DataFrame(records)
+
+
+def _year_span(years):
+    if not len(years):
+        return ''
+    first, last = int(years.min()), int(years.max())
+    return str(first) if first == last else f"{first}–{last}"
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+# Vectorized feature-engineering steps for the raw netflix_titles frame.
+# Each step takes and returns the frame so they can be run or tested alone.
+
+
+def clean_missing(df):
+    df['country'] = df['country'].fillna('Unknown')
+    df['cast'] = df['cast'].fillna('Unknown')
+    df['director'] = df['director'].fillna('Unknown')
+    df['description'] = df['description'].fillna('')
+    return df
+
+
+def fill_date_added(df):
+    # Titles without a usable date_added fall back to January 1st of their release year.
+    # Catalogs repeat the same few thousand dates, so each distinct string is parsed
+    # once: the "September 25, 2021" layout on the fast fixed-format path and only
+    # the leftovers through the much slower per-element 'mixed' inference.
+    codes, uniques = pd.factorize(df['date_added'].astype(object))
+    text = pd.Series(uniques, dtype=object)
+    parsed = pd.to_datetime(text.str.strip(), format='%B %d, %Y', errors='coerce')
+    leftover = parsed.isna().to_numpy()
+    if leftover.any():
+        parsed[leftover] = pd.to_datetime(text[leftover], format='mixed', errors='coerce')
+    # Missing values have code -1, which picks the trailing NaT
+    lookup = np.append(parsed.to_numpy(), np.datetime64('NaT', 'ns'))
+    dates = pd.Series(lookup[codes], index=df.index)
+    fallback = pd.to_datetime(
+        pd.DataFrame({'year': df['release_year'], 'month': 1, 'day': 1}),
+        errors='coerce'
+    )
+    df['date_added'] = dates.fillna(fallback)
+    return df
+
+
+def add_date_parts(df):
+    df['year_added'] = df['date_added'].dt.year
+    df['month_added'] = df['date_added'].dt.month
+    return df
+
+
+def add_genres(df):
+    df['genres'] = df['listed_in'].fillna('nan').astype(str).str.split(', ')
+    return df
+
+
+def add_primary_country(df):
+    first = df['country'].fillna('nan').astype(str).str.split(',', n=1, expand=True)[0]
+    df['primary_country'] = first.str.strip()
+    return df
+
+
+def add_durations(df):
+    duration = df['duration'].fillna('').astype(str)
+    value = pd.to_numeric(duration.str.extract(r'^(\d+)', expand=False), errors='coerce')
+    df['duration_minutes'] = np.where(duration.str.contains('min', regex=False), value, np.nan)
+    df['duration_seasons'] = np.where(duration.str.contains('Season', regex=False), value, np.nan)
+    return df
+
+
+def add_text_lengths(df):
+    df['description_length'] = df['description'].str.len()
+    df['title_length'] = df['title'].astype(str).str.len()
+    return df
+
+
+FEATURE_STEPS = [
+    clean_missing,
+    fill_date_added,
+    add_date_parts,
+    add_genres,
+    add_primary_country,
+    add_durations,
+    add_text_lengths,
+]
+
+
+def engineer_features(df, steps=FEATURE_STEPS):
+    for step in steps:
+        df = step(df)
+    return df
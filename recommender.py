@@ -0,0 +1,209 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from data_store import ARTIFACT_PATH, read_artifact_table
+from indexes import MultiValueIndex
+
+# Words of a description, lowercased; numbers and one-letter words are left out
+TOKEN_PATTERN = r"[a-z][a-z']+"
+
+STOPWORDS = frozenset("""
+    about after again against all also an and any are as at be because been before
+    being between both but by can could did do does doing during each few for from
+    further had has have having he her here hers him his how if in into is it its
+    itself just more most no nor not now of off on once only or other our out over
+    own same she should so some such than that the their theirs them then there
+    these they this those through to too under until up very was we were what when
+    where which while who whom why will with would you your
+""".split())
+
+# Share of the similarity each feature block contributes
+FEATURE_WEIGHTS = {'description': 0.6, 'genres': 0.25, 'primary_country': 0.1, 'rating': 0.05}
+
+# Terms in fewer descriptions than this carry no similarity
+MIN_DOCUMENT_FREQUENCY = 2
+
+# Query vectors scored per sparse product; bounds the dense score block to n_rows x this
+QUERY_BATCH = 32
+
+# Catalogs from this size get the approximate index by default
+ANN_MIN_ROWS = 200_000
+
+
+def normalize_rows(matrix):
+    # Rows scaled to unit length, so dot products are cosine similarities
+    matrix = sp.csr_matrix(matrix, dtype=np.float32)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sp.csr_matrix(sp.diags(1 / norms) @ matrix, dtype=np.float32)
+
+
+def tfidf_matrix(texts, min_df=MIN_DOCUMENT_FREQUENCY):
+    # Sublinear TF-IDF of the description words, one L2-normalized row per title
+    texts = pd.Series(texts, dtype=object).fillna('').astype(str).reset_index(drop=True)
+    tokens = texts.str.lower().str.findall(TOKEN_PATTERN).explode().dropna()
+    tokens = tokens[~tokens.isin(STOPWORDS)]
+    counts = MultiValueIndex.from_exploded(tokens, len(texts))
+    tf = sp.csr_matrix(
+        (np.ones(len(counts.codes), dtype=np.float32), counts.codes, counts.offsets),
+        shape=(len(texts), len(counts.labels))
+    )
+    tf.sum_duplicates()
+    document_frequency = np.bincount(tf.indices, minlength=tf.shape[1])
+    keep = np.flatnonzero(document_frequency >= min_df)
+    tf = tf[:, keep]
+    tf.data = 1 + np.log(tf.data)
+    idf = np.log((1 + len(texts)) / (1 + document_frequency[keep])) + 1
+    return normalize_rows(tf @ sp.diags(idf.astype(np.float32)))
+
+
+def one_hot(values):
+    codes, labels = pd.factorize(pd.Series(values))
+    rows = np.flatnonzero(codes >= 0)
+    return sp.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, codes[rows])),
+        shape=(len(codes), max(len(labels), 1))
+    )
+
+
+def top_k(scores, k, exclude=None):
+    # Indices of the k largest scores, best first
+    if exclude is not None and len(exclude):
+        scores = scores.copy()
+        scores[exclude] = -np.inf
+    k = min(k, int(np.isfinite(scores).sum()))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    best = np.argpartition(-scores, k - 1)[:k]
+    return best[np.lexsort((best, -scores[best]))]
+
+
+class ClusterIndex:
+    # Approximate nearest neighbours by cosine (an inverted-file index): titles are
+    # grouped by spherical k-means, and a query is scored exactly against the
+    # members of the probes clusters whose centroids it is closest to
+    def __init__(self, matrix, clusters=None, probes=8, iterations=8, seed=0):
+        rng = np.random.default_rng(seed)
+        n_rows = matrix.shape[0]
+        clusters = min(clusters or int(np.sqrt(n_rows)), n_rows)
+        self.probes = probes
+        # features x clusters, contiguous so sparse products need no copy of it
+        self.centroids = np.ascontiguousarray(matrix[rng.choice(n_rows, clusters, replace=False)].toarray().T)
+        for _ in range(iterations):
+            assignment = self.nearest(matrix, 1)[:, 0]
+            members = sp.csr_matrix(
+                (np.ones(n_rows, dtype=np.float32), (assignment, np.arange(n_rows))),
+                shape=(clusters, n_rows)
+            )
+            sums = (members @ matrix).toarray()
+            norms = np.linalg.norm(sums, axis=1)
+            # An emptied cluster keeps its previous centroid
+            filled = np.flatnonzero(norms > 0)
+            self.centroids[:, filled] = (sums[filled] / norms[filled, None]).T
+        assignment = self.nearest(matrix, 1)[:, 0]
+        self.order = np.argsort(assignment, kind='stable')
+        self.offsets = np.zeros(clusters + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignment, minlength=clusters), out=self.offsets[1:])
+
+    @property
+    def nbytes(self):
+        return self.centroids.nbytes + self.order.nbytes + self.offsets.nbytes
+
+    def nearest(self, vectors, n):
+        # The n closest clusters of each vector, in blocks to bound the dense scores
+        n = min(n, self.centroids.shape[1])
+        result = []
+        for start in range(0, vectors.shape[0], 4096):
+            scores = vectors[start:start + 4096] @ self.centroids
+            result.append(np.argpartition(-scores, n - 1, axis=1)[:, :n])
+        return np.concatenate(result)
+
+    def members(self, clusters):
+        return np.sort(np.concatenate([self.order[self.offsets[c]:self.offsets[c + 1]] for c in clusters]))
+
+
+class Recommender:
+    # "More like this": titles as sparse vectors of weighted feature blocks (TF-IDF
+    # of the description, one-hot genres, country and rating), scored against a
+    # query by sparse dot products over the whole catalog, or over the candidates of
+    # an approximate cluster index
+    def __init__(self, descriptions, genre_index, countries, ratings,
+                 weights=FEATURE_WEIGHTS, approximate=None, probes=8, seed=0):
+        blocks = {
+            'description': tfidf_matrix(descriptions),
+            'genres': normalize_rows(genre_index.incidence(dtype=np.float32)),
+            'primary_country': one_hot(countries),
+            'rating': one_hot(ratings),
+        }
+        # Each block is unit length per title, so block weights are shares of the cosine
+        self.matrix = normalize_rows(sp.hstack(
+            [blocks[name] * np.float32(np.sqrt(weight)) for name, weight in weights.items()],
+            format='csr'
+        ))
+        self.n_rows = self.matrix.shape[0]
+        if approximate is None:
+            approximate = self.n_rows >= ANN_MIN_ROWS
+        self.ann = ClusterIndex(self.matrix, probes=probes, seed=seed) if approximate else None
+
+    @classmethod
+    def from_artifact(cls, data, genre_index, artifact_path=ARTIFACT_PATH, **kwargs):
+        descriptions = read_artifact_table(artifact_path, ['description'])['description'].to_pandas()
+        return cls(descriptions, genre_index, data['primary_country'], data['rating'], **kwargs)
+
+    @property
+    def nbytes(self):
+        total = self.matrix.data.nbytes + self.matrix.indices.nbytes + self.matrix.indptr.nbytes
+        return total + (self.ann.nbytes if self.ann is not None else 0)
+
+    def centroid(self, rows):
+        # Mean direction of the selected titles, as a 1 x features query
+        if not len(rows):
+            return None
+        selected = np.zeros(self.n_rows, dtype=np.float32)
+        selected[rows] = 1
+        return normalize_rows(sp.csr_matrix(self.matrix.T @ selected))
+
+    def search(self, queries, k=10, exclude=None, approximate=None):
+        # Top-k (row ids, scores) for each query row; exclude is a list of row-id
+        # arrays, one per query, kept out of its results
+        queries = sp.csr_matrix(queries, dtype=np.float32)
+        exclude = exclude if exclude is not None else [None] * queries.shape[0]
+        if approximate is None:
+            approximate = self.ann is not None
+        if approximate and self.ann is not None:
+            probed = self.ann.nearest(queries, self.ann.probes)
+            return [self._search_candidates(queries[i], self.ann.members(probed[i]), k, exclude[i])
+                    for i in range(queries.shape[0])]
+
+        results = []
+        for start in range(0, queries.shape[0], QUERY_BATCH):
+            batch = queries[start:start + QUERY_BATCH]
+            # A dense block of query columns turns the product into one pass over the catalog
+            scores = self.matrix @ np.ascontiguousarray(batch.T.toarray())
+            for j in range(batch.shape[0]):
+                best = top_k(scores[:, j], k, exclude[start + j])
+                results.append((best, scores[best, j]))
+        return results
+
+    def _search_candidates(self, query, candidates, k, exclude):
+        if exclude is not None and len(exclude):
+            candidates = np.setdiff1d(candidates, exclude, assume_unique=True)
+        if len(candidates) < k:
+            # Too few titles in the probed clusters: score the whole catalog
+            return self.search(query, k, [exclude], approximate=False)[0]
+        scores = self.matrix[candidates] @ query.toarray().ravel()
+        best = top_k(scores, k)
+        return candidates[best], scores[best]
+
+    def like_titles(self, rows, k=10, approximate=None):
+        # Titles most like each of rows, without the title itself
+        rows = np.asarray(rows)
+        return self.search(self.matrix[rows], k, [[row] for row in rows], approximate)
+
+    def like_selection(self, rows, k=10, approximate=None):
+        # Titles outside the selection most like the selection as a whole
+        query = self.centroid(rows)
+        if query is None:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        return self.search(query, k, [rows], approximate)[0]
@@ -0,0 +1,155 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from indexes import concat_ranges
+
+SEARCH_FIELDS = ['title', 'cast', 'director', 'description']
+
+# Placeholders filled in during cleaning that should not be searchable
+MISSING_VALUES = {'cast': 'Unknown', 'director': 'Unknown'}
+
+# Rows tokenized at a time while building an index; the scratch arrays of a batch
+# take about 30 bytes per byte of its text
+BUILD_BATCH_ROWS = 10_000
+
+
+class TrigramIndex:
+    # Byte-trigram posting lists over lowercased UTF-8 text; candidates from the
+    # index are confirmed with a substring match against source, an Arrow array
+    # that may be backed by the memory-mapped artifact. Rows equal to missing
+    # are left out of the index and the matches.
+    def __init__(self, texts, missing=None, batch_rows=BUILD_BATCH_ROWS):
+        if isinstance(texts, (pa.Array, pa.ChunkedArray)):
+            self.source = texts
+        else:
+            self.source = pa.array(pd.Series(texts, dtype=object).fillna('').astype(str).to_numpy(), type=pa.string())
+        self.n_rows = len(self.source)
+
+        # Each batch gives its distinct trigrams, their row counts and the rows
+        # grouped by trigram; only one batch's scratch arrays are alive at a time
+        batches = []
+        searchable = []
+        for start in range(0, self.n_rows, batch_rows):
+            values = pd.Series(self.source.slice(start, batch_rows).to_pandas(), dtype=object).fillna('').astype(str)
+            if missing is not None:
+                values = values.where(values != missing, '')
+            searchable.append((values != '').to_numpy())
+            batches.append(_batch_postings(values, start))
+        self.searchable = np.concatenate(searchable) if searchable else np.zeros(0, dtype=bool)
+
+        # Merged into one CSR layout: batches cover increasing rows, so appending
+        # each batch's rows to its trigrams' slices keeps every slice sorted
+        self.grams = np.unique(np.concatenate([grams for grams, _, _ in batches] or [np.zeros(0, np.uint32)]))
+        counts = np.zeros(len(self.grams), dtype=np.int64)
+        for grams, gram_counts, _ in batches:
+            counts[np.searchsorted(self.grams, grams)] += gram_counts
+        self.posting_offsets = np.zeros(len(self.grams) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.posting_offsets[1:])
+        self.posting_rows = np.empty(self.posting_offsets[-1], dtype=np.int32)
+        ends = self.posting_offsets[:-1].copy()
+        while batches:
+            grams, gram_counts, rows = batches.pop(0)
+            positions = np.searchsorted(self.grams, grams)
+            self.posting_rows[concat_ranges(ends[positions], gram_counts)] = rows
+            ends[positions] += gram_counts
+
+    @property
+    def nbytes(self):
+        return self.posting_rows.nbytes + self.grams.nbytes + self.posting_offsets.nbytes + self.searchable.nbytes
+
+    def postings(self, gram):
+        i = np.searchsorted(self.grams, gram)
+        if i == len(self.grams) or self.grams[i] != gram:
+            return self.posting_rows[:0]
+        return self.posting_rows[self.posting_offsets[i]:self.posting_offsets[i + 1]]
+
+    def search(self, query):
+        query = query.lower()
+        encoded = np.frombuffer(query.encode('utf-8'), dtype=np.uint8)
+        if len(encoded) < 3:
+            # Too short for a trigram: scan, which is cheap for one or two characters
+            return np.flatnonzero(self._matches(self.source, query) & self.searchable)
+
+        lists = sorted((self.postings(g) for g in np.unique(_trigrams(encoded))), key=len)
+        candidates = lists[0]
+        for rows in lists[1:]:
+            if not len(candidates):
+                break
+            candidates = np.intersect1d(candidates, rows, assume_unique=True)
+        candidates = candidates.astype(np.int64)
+        return candidates[self._matches(self.source.take(candidates), query)]
+
+    @staticmethod
+    def _matches(texts, query):
+        hits = pc.match_substring(texts, query, ignore_case=True).fill_null(False)
+        return hits.to_numpy(zero_copy_only=False)
+
+
+class SearchIndex:
+    # One trigram index per field, built the first time a query searches that field,
+    # so startup does not pay for fields (such as description) nobody searches
+    def __init__(self, data, fields=SEARCH_FIELDS):
+        # data may be a DataFrame or an Arrow table; Arrow columns are kept as the match source
+        self.data = data
+        self.n_rows = len(data)
+        self.fields = {}
+        self._locks = {field: threading.Lock() for field in fields}
+
+    def field(self, name):
+        if name not in self._locks:
+            raise KeyError(f"{name!r} is not a search field")
+        with self._locks[name]:
+            if name not in self.fields:
+                self.fields[name] = TrigramIndex(self.data[name], MISSING_VALUES.get(name))
+            return self.fields[name]
+
+    @property
+    def nbytes(self):
+        # Bytes of the field indexes built so far
+        return sum(index.nbytes for index in list(self.fields.values()))
+
+    def search(self, query, fields=('title',)):
+        hits = [self.field(field).search(query) for field in fields]
+        return np.unique(np.concatenate(hits)) if hits else np.zeros(0, dtype=np.int64)
+
+    def mask(self, query, fields=('title',)):
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[self.search(query, fields)] = True
+        return mask
+
+
+def _batch_postings(texts, first_row):
+    # Distinct trigrams of a batch of texts, the number of rows holding each and
+    # those rows grouped by trigram, in order. Documents are joined with NUL
+    # separators; a window touching one is not a trigram.
+    lowered = texts.str.lower().str.replace('\x00', '', regex=False)
+    buf = np.frombuffer('\x00'.join(lowered).encode('utf-8'), dtype=np.uint8)
+    if len(buf) < 3:
+        return np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int32)
+    valid = (buf[:-2] != 0) & (buf[1:-1] != 0) & (buf[2:] != 0)
+    rows = np.cumsum(buf == 0, dtype=np.int32)[:-2][valid]
+    keys = _trigrams(buf)[valid].astype(np.uint64) << np.uint64(32)
+    keys |= rows.astype(np.uint64)
+    del rows, valid
+    keys.sort()
+    keys = keys[_run_starts(keys)]
+
+    grams = (keys >> np.uint64(32)).astype(np.uint32)
+    starts = np.flatnonzero(_run_starts(grams))
+    rows = (keys & np.uint64(0xFFFFFFFF)).astype(np.int32) + np.int32(first_row)
+    return grams[starts], np.diff(np.append(starts, len(grams))), rows
+
+
+def _trigrams(buf):
+    return (buf[:-2].astype(np.uint32) << 16) | (buf[1:-1].astype(np.uint32) << 8) | buf[2:]
+
+
+def _run_starts(sorted_values):
+    # True at the first element of each run of equal values
+    starts = np.ones(len(sorted_values), dtype=bool)
+    starts[1:] = sorted_values[1:] != sorted_values[:-1]
+    return starts
@@ -0,0 +1,157 @@
+import hashlib
+import multiprocessing
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+SENTIMENT_CACHE_PATH = "sentiment_cache.sqlite"
+
+POSITIVE_THRESHOLD = 0.2
+NEGATIVE_THRESHOLD = -0.2
+
+# Below this many uncached texts a process pool costs more than it saves
+MIN_PARALLEL_TEXTS = 2000
+
+# The VADER lexicon is looked up locally and only fetched, into this directory,
+# when no NLTK data path has it yet
+NLTK_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nltk_data')
+VADER_LEXICON = 'sentiment/vader_lexicon.zip'
+
+# Scoring workers start from a fresh interpreter instead of a fork of the calling
+# process, which may be the multithreaded Streamlit server
+POOL_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+_analyzer = None
+
+
+def text_key(text):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+class SentimentCache:
+    # On-disk compound scores keyed by a hash of the description text
+    def __init__(self, path=SENTIMENT_CACHE_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS scores (key BLOB PRIMARY KEY, compound REAL NOT NULL)"
+        )
+
+    def get_many(self, keys, batch_size=500):
+        found = {}
+        for start in range(0, len(keys), batch_size):
+            batch = keys[start:start + batch_size]
+            placeholders = ','.join('?' * len(batch))
+            rows = self.conn.execute(
+                f"SELECT key, compound FROM scores WHERE key IN ({placeholders})", batch
+            )
+            found.update(rows)
+        return found
+
+    def put_many(self, items):
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO scores VALUES (?, ?)", items)
+
+    def close(self):
+        self.conn.close()
+
+
+def ensure_lexicon(download_dir=NLTK_DATA_DIR):
+    import nltk
+    if download_dir not in nltk.data.path:
+        nltk.data.path.append(download_dir)
+    try:
+        nltk.data.find(VADER_LEXICON)
+    except LookupError:
+        if not nltk.download('vader_lexicon', download_dir=download_dir, quiet=True):
+            raise LookupError("the VADER lexicon is not installed and could not be downloaded")
+
+
+def _get_analyzer():
+    global _analyzer
+    if _analyzer is None:
+        ensure_lexicon()
+        from nltk.sentiment.vader import SentimentIntensityAnalyzer
+        _analyzer = SentimentIntensityAnalyzer()
+    return _analyzer
+
+
+def _score_chunk(texts):
+    sid = _get_analyzer()
+    return [sid.polarity_scores(text)['compound'] for text in texts]
+
+
+def scoring_pool(workers=None):
+    # A process pool to pass to score_texts across many calls, so worker processes
+    # start and load the lexicon once per build rather than once per call. The
+    # lexicon is fetched here, before any worker starts, so workers only read it
+    # and never race each other downloading it.
+    ensure_lexicon()
+    return ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1,
+                               mp_context=multiprocessing.get_context(POOL_START_METHOD))
+
+
+def _score_parallel(texts, workers, chunk_size, executor=None):
+    if workers == 1 or len(texts) < MIN_PARALLEL_TEXTS:
+        return _score_chunk(texts)
+    if executor is None:
+        with scoring_pool(workers) as executor:
+            return _score_parallel(texts, workers, chunk_size, executor)
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    scores = []
+    for chunk_scores in executor.map(_score_chunk, chunks):
+        scores.extend(chunk_scores)
+    return scores
+
+
+def score_texts(texts, cache_path=SENTIMENT_CACHE_PATH, workers=None, chunk_size=1000, executor=None):
+    # Batch VADER compound scores; empty texts score 0 and each distinct text is scored
+    # once. executor is a scoring_pool() to reuse; without one a pool lives for this call.
+    codes, uniques = pd.factorize(pd.Series(texts, dtype=object).fillna('').astype(str))
+    unique_scores = np.zeros(len(uniques))
+    to_score = [i for i, text in enumerate(uniques) if text]
+    if not to_score:
+        return unique_scores[codes]
+
+    keys = [text_key(uniques[i]) for i in to_score]
+    cache = SentimentCache(cache_path) if cache_path else None
+    try:
+        cached = cache.get_many(keys) if cache else {}
+        missing = []
+        for i, key in zip(to_score, keys):
+            if key in cached:
+                unique_scores[i] = cached[key]
+            else:
+                missing.append((i, key))
+
+        if missing:
+            scores = _score_parallel(
+                [uniques[i] for i, _ in missing], workers or os.cpu_count() or 1, chunk_size, executor
+            )
+            for (i, _), score in zip(missing, scores):
+                unique_scores[i] = score
+            if cache:
+                cache.put_many([(key, score) for (_, key), score in zip(missing, scores)])
+    finally:
+        if cache:
+            cache.close()
+
+    return unique_scores[codes]
+
+
+def label_scores(scores):
+    scores = np.asarray(scores)
+    return np.select(
+        [scores > POSITIVE_THRESHOLD, scores < NEGATIVE_THRESHOLD],
+        ['Positive', 'Negative'],
+        default='Neutral'
+    )
+
+
+def add_sentiment(df, **kwargs):
+    df['sentiment_score'] = score_texts(df['description'].to_numpy(), **kwargs)
+    df['sentiment_label'] = label_scores(df['sentiment_score'])
+    return df
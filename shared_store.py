@@ -0,0 +1,128 @@
+import argparse
+import os
+import re
+import time
+from collections import namedtuple
+
+import pyarrow as pa
+
+import data_store
+
+# One loader process publishes the dataset into a shared directory (by default on
+# /dev/shm) and dashboard workers attach to it read-only. Every publish writes a
+# new versioned artifact and resident frame and only then bumps the version file,
+# so a worker that reads version N always finds files that belong together.
+# Workers memory-map those files: the OS keeps one copy of the pages for all of them.
+
+DEFAULT_SHARED_DIR = '/dev/shm/netflix-dashboard'
+SHARED_DIR_ENV = 'NETFLIX_SHARED_DATASET_DIR'
+VERSION_FILE = 'VERSION'
+
+# Versions kept on disk so workers still attaching to an older one can finish
+KEEP_VERSIONS = 3
+
+Dataset = namedtuple('Dataset', ['version', 'artifact_path', 'resident_path'])
+
+_VERSIONED_FILE = re.compile(r'^titles\.v(\d+)\.')
+
+
+def dataset_paths(directory, version):
+    return Dataset(
+        version,
+        os.path.join(directory, f'titles.v{version}.arrow'),
+        os.path.join(directory, f'titles.v{version}.resident.arrow'),
+    )
+
+
+def current_version(directory):
+    try:
+        with open(os.path.join(directory, VERSION_FILE)) as f:
+            return int(f.read())
+    except FileNotFoundError:
+        return None
+
+
+def current_dataset(directory):
+    version = current_version(directory)
+    if version is None:
+        raise FileNotFoundError(f"no dataset has been published in {directory}")
+    return dataset_paths(directory, version)
+
+
+def write_resident(artifact_path, resident_path):
+    # The resident frame in the exact layout workers use, one contiguous buffer
+    # per column, so to_pandas() can view most columns without copying
+    frame = data_store.read_resident_frame(artifact_path)
+    table = pa.Table.from_pandas(frame, preserve_index=False).combine_chunks()
+    tmp_path = f"{resident_path}.tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=max(table.num_rows, 1))
+    os.replace(tmp_path, resident_path)
+
+
+def attach_resident_frame(resident_path):
+    # Zero-copy for columns without missing values: their pandas arrays are
+    # read-only views of the mapped file
+    return data_store.read_artifact_table(resident_path).to_pandas(split_blocks=True)
+
+
+def publish(csv_path=data_store.SOURCE_CSV, directory=DEFAULT_SHARED_DIR,
+            chunksize=data_store.INGEST_CHUNKSIZE):
+    # Publishes a new version when the source changed, re-engineering only the
+    # titles that differ from the current version; returns the current Dataset
+    os.makedirs(directory, exist_ok=True)
+    source_hash = data_store.file_hash(csv_path)
+    version = current_version(directory)
+    previous = dataset_paths(directory, version) if version is not None else None
+    if previous is not None and data_store.artifact_source_hash(previous.artifact_path) == source_hash:
+        return previous
+
+    dataset = dataset_paths(directory, (version or 0) + 1)
+    data_store.refresh_dataset(
+        csv_path, dataset.artifact_path, source_hash=source_hash, chunksize=chunksize,
+        previous_path=previous.artifact_path if previous is not None else None
+    )
+    write_resident(dataset.artifact_path, dataset.resident_path)
+
+    version_path = os.path.join(directory, VERSION_FILE)
+    with open(f"{version_path}.tmp", 'w') as f:
+        f.write(str(dataset.version))
+    os.replace(f"{version_path}.tmp", version_path)
+    prune_versions(directory, dataset.version)
+    return dataset
+
+
+def prune_versions(directory, version):
+    # Unlinking is safe for workers that still map an old file; its pages stay
+    # valid until they drop the mapping
+    for name in os.listdir(directory):
+        match = _VERSIONED_FILE.match(name)
+        if match and int(match.group(1)) <= version - KEEP_VERSIONS:
+            os.remove(os.path.join(directory, name))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish the Netflix titles dataset for dashboard workers")
+    parser.add_argument('--source', default=data_store.SOURCE_CSV, help="Source CSV path")
+    parser.add_argument('--directory', default=os.environ.get(SHARED_DIR_ENV, DEFAULT_SHARED_DIR),
+                        help="Shared directory the workers attach to")
+    parser.add_argument('--watch', type=float, default=0,
+                        help="Check the source for changes every N seconds instead of exiting")
+    parser.add_argument('--chunksize', type=int, default=data_store.INGEST_CHUNKSIZE,
+                        help="Rows per ingestion chunk")
+    args = parser.parse_args()
+
+    published = None
+    while True:
+        dataset = publish(args.source, args.directory, args.chunksize)
+        if dataset.version != published:
+            print(f"Published version {dataset.version} to {args.directory}")
+            published = dataset.version
+        if not args.watch:
+            return
+        time.sleep(args.watch)
+
+
+if __name__ == '__main__':
+    main()
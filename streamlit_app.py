@@ -1,25 +1,19 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import matplotlib.pyplot as plt
-from wordcloud import WordCloud
-from textblob import TextBlob
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-import nltk
-import numpy as np
-from collections import Counter
-from PIL import Image
-import time
-import json
-from streamlit_lottie import st_lottie
-
-# Download NLTK data
-try:
-    nltk.download('vader_lexicon', quiet=True)
-except Exception as e:
-    st.error(f"Error downloading NLTK data: {e}")
+import os
+import uuid
+from data_store import ensure_artifact, SOURCE_CSV, ARTIFACT_PATH
+from filters import FilterState
+from forecast import FORECAST_HORIZON
+from search_index import SEARCH_FIELDS
+from wordcloud_service import WordCloudService
+from export import EXPORT_FORMATS, ExportService
+from engine import AnalyticsEngine
+from background import BackgroundJobs
+from shared_store import Dataset, SHARED_DIR_ENV, current_dataset
+from charts import fit_to_budget, histogram_bar
+from instrumentation import METRICS, METRICS_PORT_ENV, TIMINGS_LOG_ENV, Recorder, log_to_file, serve_metrics
 
 # Custom page configuration with Netflix-inspired theme
 st.set_page_config(
@@ -218,61 +212,70 @@ def metric_card(title, value, change=None, icon="🎬"):
     """
     return card_html
 
-# Load data with progress animation
-@st.cache_data
-def load_data():
+# Timing spans around loading, filtering, tab computations and charts. They are
+# recorded when the debug panel is open, or for the whole process when a metrics
+# port or a timings log is configured; otherwise every span is a no-op.
+METRICS_PORT = os.environ.get(METRICS_PORT_ENV)
+TIMINGS_LOG = os.environ.get(TIMINGS_LOG_ENV)
+
+@st.cache_resource
+def start_metrics_server(port):
+    return serve_metrics(port)
+
+@st.cache_resource
+def start_timings_log(path):
+    return log_to_file(path)
+
+if METRICS_PORT:
+    start_metrics_server(int(METRICS_PORT))
+if TIMINGS_LOG:
+    start_timings_log(TIMINGS_LOG)
+
+timings = Recorder(
+    enabled=bool(st.session_state.get('debug_timings') or METRICS_PORT or TIMINGS_LOG),
+    metrics=METRICS
+)
+
+# Charts are timed in two parts: building the figure, and serializing it to the page.
+# Line and area traces are thinned to the chart point budget before they are sent.
+def show_chart(fig, name):
+    with timings.span(f'chart/{name}/serialize'):
+        st.plotly_chart(fit_to_budget(fig), use_container_width=True)
+
+# Bring the artifact up to date with the source CSV. The file is only re-hashed
+# when its size or modification time changes, and a refresh re-processes only
+# added, changed and removed titles into a new versioned artifact. Everything below
+# is keyed on the returned dataset, so a refresh swaps the whole dataset in at the
+# next rerun while pages still holding the previous one keep reading its file.
+@st.cache_resource(max_entries=1)
+def sync_dataset(mtime_ns, size):
+    version, artifact_path = ensure_artifact(SOURCE_CSV, ARTIFACT_PATH)
+    return Dataset(version, artifact_path, None)
+
+# With several server processes, a loader (shared_store.py) publishes the dataset
+# into a shared directory and every worker attaches to its current version instead
+SHARED_DATASET_DIR = os.environ.get(SHARED_DIR_ENV)
+
+def active_dataset():
+    if SHARED_DATASET_DIR:
+        return current_dataset(SHARED_DATASET_DIR)
+    stat = os.stat(SOURCE_CSV)
+    return sync_dataset(stat.st_mtime_ns, stat.st_size)
+
+# Load data with progress animation. The analytics engine holds the read-only frame,
+# its indexes and the filter and tab caches for one dataset version, shared by all
+# sessions; the script only turns widget values into engine calls and draws the results.
+@st.cache_resource(max_entries=1)
+def load_engine(dataset):
     try:
         with st.spinner('🍿 Loading Netflix data... Please wait...'):
-            # Simulate loading delay for better UX
-            time.sleep(1.5)
-            
-            df = pd.read_csv("netflix_titles.csv")
-            
-            # Data cleaning
-            df['country'] = df['country'].fillna('Unknown')
-            df['cast'] = df['cast'].fillna('Unknown')
-            df['director'] = df['director'].fillna('Unknown')
-            df['description'] = df['description'].fillna('')
-            
-            # Handle date conversion
-            df['date_added'] = pd.to_datetime(df['date_added'], format='mixed', errors='coerce')
-            df['date_added'] = df.apply(
-                lambda row: pd.Timestamp(f"{row['release_year']}-01-01") if pd.isna(row['date_added']) else row['date_added'],
-                axis=1
-            )
-            
-            # Feature engineering
-            df['year_added'] = df['date_added'].dt.year
-            df['month_added'] = df['date_added'].dt.month
-            df['genres'] = df['listed_in'].apply(lambda x: str(x).split(', '))
-            
-            # Extract primary country
-            df['primary_country'] = df['country'].apply(lambda x: str(x).split(',')[0].strip())
-            
-            # Duration processing
-            df['duration_minutes'] = df['duration'].apply(lambda x: 
-                int(str(x).split(' ')[0]) if 'min' in str(x) else np.nan)
-            df['duration_seasons'] = df['duration'].apply(lambda x: 
-                int(str(x).split(' ')[0]) if 'Season' in str(x) else np.nan)
-            
-            # Sentiment analysis
-            sid = SentimentIntensityAnalyzer()
-            df['sentiment_score'] = df['description'].apply(
-                lambda x: sid.polarity_scores(str(x))['compound'] if x else 0
-            )
-            df['sentiment_label'] = df['sentiment_score'].apply(
-                lambda x: 'Positive' if x > 0.2 else 'Negative' if x < -0.2 else 'Neutral'
-            )
-            
-            # Text analysis
-            df['description_length'] = df['description'].apply(len)
-            df['title_length'] = df['title'].apply(len)
+            engine = AnalyticsEngine(dataset)
             
             st.success("Data loaded successfully!")
-            return df
+            return engine
     except Exception as e:
         st.error(f"Error loading data: {e}")
-        return pd.DataFrame()
+        return None
 
 # Add Netflix logo to sidebar
 add_netflix_logo()
@@ -281,10 +284,31 @@ add_netflix_logo()
 animated_title()
 
 # Load data
-df = load_data()
+try:
+    with timings.span('load/dataset'):
+        dataset = active_dataset()
+except Exception as e:
+    st.error(f"Error loading data: {e}")
+    st.stop()
+with timings.span('load/engine'):
+    engine = load_engine(dataset)
 
-if df.empty:
+if engine is None or engine.data.empty:
     st.stop()
+df = engine.data
+
+# Title term frequencies and rendered word clouds, built the first time the Text tab is shown
+@st.cache_resource(max_entries=1)
+def load_wordcloud_service(dataset, _data):
+    return WordCloudService(_data['title'])
+
+# Exported selections, written on request and kept on disk for repeat downloads
+@st.cache_resource(max_entries=1)
+def load_export_service(dataset):
+    return ExportService(dataset.artifact_path)
+
+with timings.span('load/export_service'):
+    export_service = load_export_service(dataset)
 
 # Sidebar Filters with enhanced UI
 st.sidebar.header("🎛️ Filter Controls")
@@ -292,7 +316,8 @@ st.sidebar.header("🎛️ Filter Controls")
 # Dynamic filter options based on data
 years = sorted([y for y in df['year_added'].dropna().unique() if not pd.isna(y)])
 countries = sorted([c for c in df['primary_country'].unique() if c != 'Unknown'])
-all_genres = sorted(set(g.strip() for genre_list in df['genres'] for g in genre_list if g.strip()))
+listed_countries = sorted([c for c in engine.country_index.labels if c != 'Unknown'])
+all_genres = engine.genre_index.labels.tolist()
 
 # NEW: Theme toggle
 theme = st.sidebar.radio("🌓 Theme Mode", ["Dark", "Light"], index=0, key="theme_toggle")
@@ -302,6 +327,12 @@ if theme == "Light":
 # NEW: Title search
 with st.sidebar.expander("🔍 Title Search", expanded=False):
     search_query = st.text_input("Search for a Title", "")
+    search_fields = st.multiselect(
+        "Search In",
+        options=SEARCH_FIELDS,
+        default=['title'],
+        format_func=str.capitalize
+    )
 
 # Filter widgets with better organization
 with st.sidebar.expander("⏳ Time Filters", expanded=True):
@@ -313,10 +344,13 @@ with st.sidebar.expander("⏳ Time Filters", expanded=True):
     )
     
 with st.sidebar.expander("🌎 Location & Content", expanded=True):
+    # Co-productions: match and count every listed country, not only the first
+    all_countries = st.checkbox("Count Every Listed Country", value=False, key="all_countries")
+    country_options = listed_countries if all_countries else countries
     selected_countries = st.multiselect(
         "Select Countries", 
-        options=countries, 
-        default=countries[:3] if len(countries) > 3 else countries,
+        options=country_options, 
+        default=country_options[:3] if len(country_options) > 3 else country_options,
         max_selections=10
     )
     content_type = st.selectbox(
@@ -338,73 +372,60 @@ with st.sidebar.expander("🌎 Location & Content", expanded=True):
         )
 
 # Apply filters dynamically
-def apply_filters(data):
-    filtered = data.copy()
-    
-    # Year range filter
-    filtered = filtered[
-        (filtered['year_added'] >= year_range[0]) & 
-        (filtered['year_added'] <= year_range[1])
-    ]
-    
-    # Country filter
-    if selected_countries:
-        filtered = filtered[filtered['primary_country'].isin(selected_countries)]
-    
-    # Content type filter
-    if content_type != 'All':
-        filtered = filtered[filtered['type'] == content_type]
-    
-    # Genre filter
-    if selected_genres:
-        filtered = filtered[filtered['genres'].apply(
-            lambda gs: any(g in selected_genres for g in gs)
-        )]
-    
-    # NEW: Title search filter
-    if search_query:
-        filtered = filtered[filtered['title'].str.contains(search_query, case=False, na=False)]
-    
-    return filtered
+filter_state = FilterState(
+    year_range, selected_countries, content_type, selected_genres, search_query,
+    tuple(search_fields) or ('title',), all_countries
+)
 
-# Apply filters
-filtered_df = apply_filters(df)
+# Apply filters: a single row selection of the shared frame feeds every tab, and
+# chart counts come from slicing the engine's cube
+with timings.span('filter'):
+    selection = engine.filter(filter_state)
+row_ids = selection.row_ids
+filter_key = selection.state
 
-# NEW: Download filtered data
-csv = filtered_df.to_csv(index=False).encode('utf-8')
+# NEW: Download filtered data, serialized only when the button is clicked
+export_format = st.sidebar.selectbox(
+    "Export Format",
+    options=list(EXPORT_FORMATS),
+    format_func=lambda fmt: EXPORT_FORMATS[fmt].label,
+    key='export_format'
+)
 st.sidebar.download_button(
     "📥 Download Filtered Data", 
-    csv, 
-    "filtered_netflix.csv", 
-    "text/csv",
-    key='download_filtered_data'
+    lambda: export_service.read(filter_key, row_ids, export_format),
+    f"filtered_netflix.{EXPORT_FORMATS[export_format].extension}", 
+    EXPORT_FORMATS[export_format].mime,
+    key='download_filtered_data',
+    on_click='ignore'
 )
 
-# Display metrics with custom cards
+# Display metrics with custom cards, counted from the cube rather than the rows
+type_counts = selection.count_by('type')
 col1, col2, col3, col4 = st.columns(4)
 with col1:
     st.markdown(metric_card(
         "Total Titles", 
-        len(filtered_df), 
-        len(filtered_df) - len(df),
+        len(selection), 
+        len(selection) - len(df),
         icon="🎬"
     ), unsafe_allow_html=True)
 with col2:
-    movies_count = len(filtered_df[filtered_df['type'] == 'Movie'])
+    movies_count = int(type_counts.get('Movie', 0))
     st.markdown(metric_card(
         "Movies", 
         movies_count, 
         icon="🎥"
     ), unsafe_allow_html=True)
 with col3:
-    tv_count = len(filtered_df[filtered_df['type'] == 'TV Show'])
+    tv_count = int(type_counts.get('TV Show', 0))
     st.markdown(metric_card(
         "TV Shows", 
         tv_count, 
         icon="📺"
     ), unsafe_allow_html=True)
 with col4:
-    countries_count = filtered_df['primary_country'].nunique()
+    countries_count = selection.distinct('primary_country')
     st.markdown(metric_card(
         "Countries", 
         countries_count, 
@@ -415,473 +436,542 @@ with col4:
 if st.sidebar.button("🔄 Reset All Filters", use_container_width=True):
     st.rerun()
 
-st.sidebar.success(f"📊 Showing {len(filtered_df)} of {len(df)} titles")
+st.sidebar.success(f"📊 Showing {len(selection)} of {len(df)} titles")
+cache_stats = engine.filter_cache.stats()
+st.sidebar.caption(f"⚡ Filter cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses")
 
-# Main content tabs with icons
-tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
-    "📊 Overview", "🎭 Genres", "⏱️ Duration", "☁️ Text Analysis", 
-    "😊 Sentiment", "📈 Trends"
-])
+# Per-tab computations, memoized by the engine per filter state and shared across sessions
+def tab_result(tab):
+    with timings.span(f'tab/{tab}/compute'):
+        return engine.tab(selection, tab)
+
+# Figures that are slow to build; they are started in the background as soon as
+# the filters change, so they are usually ready by the time their tab is opened
+def genre_evolution_figure(sel):
+    if not sel.state.genres:
+        return None
+    genre_year_data = engine.tab(sel, 'genres')['genre_year_data']
+    fig = px.line(
+        genre_year_data,
+        x='year_added',
+        y='count',
+        color='genres',
+        title="Evolution of Selected Genres",
+        labels={'year_added': 'Year', 'count': 'Number of Titles'},
+        line_shape='spline',
+        color_discrete_sequence=px.colors.sequential.Reds[1:]
+    )
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white'),
+        xaxis=dict(showgrid=False),
+        yaxis=dict(showgrid=False)
+    )
+    return fig
+
+def correlation_figure(sel):
+    corr_matrix = engine.tab(sel, 'trends')['corr_matrix']
+    if corr_matrix is None:
+        return None
+    fig = px.imshow(
+        corr_matrix,
+        text_auto=True,
+        aspect="auto",
+        color_continuous_scale='RdBu',
+        title="Correlation Matrix"
+    )
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white')
+    )
+    return fig
+
+PRECOMPUTED_CHARTS = {
+    'genre_evolution': genre_evolution_figure,
+    'correlation_matrix': correlation_figure,
+}
+
+# Background results shared by all sessions. Each session owns the jobs for its
+# current filters; when they change, its jobs that have not started are cancelled.
+@st.cache_resource(max_entries=1)
+def load_precompute(dataset):
+    return BackgroundJobs(workers=2, cache_size=128, name='precompute')
+
+precompute = load_precompute(dataset)
+precompute_owner = st.session_state.setdefault('precompute_owner', uuid.uuid4().hex)
 
-with tab1:
-    if not filtered_df.empty:
+for name, build in PRECOMPUTED_CHARTS.items():
+    precompute.submit((name, filter_key), build, selection, owner=precompute_owner)
+precompute.cancel_stale(precompute_owner, {(name, filter_key) for name in PRECOMPUTED_CHARTS})
+
+# The recommender's vectors are built off the request path once per dataset, so
+# the first recommendation does not wait for them; no session owns the job
+precompute.submit('recommender', getattr, engine, 'recommender')
+
+# Forecast series drawn, and months of history drawn before the projection
+FORECAST_SERIES = 6
+FORECAST_HISTORY_MONTHS = 36
+
+# Titles recommended, and titles offered to recommend from
+RECOMMENDATIONS = 10
+RECOMMEND_TITLE_CHOICES = 1000
+
+# The word cloud joins in once this session has loaded the word cloud service
+if st.session_state.get('precompute_wordcloud'):
+    wordcloud_service = load_wordcloud_service(dataset, df)
+    wordcloud_service.get_async(filter_key, row_ids, owner=precompute_owner)
+    wordcloud_service.jobs.cancel_stale(precompute_owner, {filter_key})
+
+def show_precomputed(name):
+    # Waits for the background job if it is still running, or builds the figure here
+    with timings.span(f'chart/{name}/build'):
+        fig = precompute.result((name, filter_key), PRECOMPUTED_CHARTS[name], selection)
+    if fig is not None:
+        show_chart(fig, name)
+
+def render_overview():
+    if len(selection):
+        data = tab_result('overview')
         col1, col2 = st.columns(2)
         
         with col1:
             # Dynamic content type visualization with custom colors
-            type_counts = filtered_df['type'].value_counts()
-            fig = px.pie(
-                values=type_counts.values,
-                names=type_counts.index,
-                title=f"Content Distribution ({len(filtered_df)} titles)",
-                color_discrete_sequence=['#E50914', '#00A8E1'],
-                hole=0.4
-            )
-            fig.update_traces(
-                textposition='inside', 
-                textinfo='percent+label',
-                marker=dict(line=dict(color='#1F1F1F', width=2))
-            )
-            fig.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='white')
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            type_counts = data['type_counts']
+            with timings.span('chart/content_distribution/build'):
+                fig = px.pie(
+                    values=type_counts.values,
+                    names=type_counts.index,
+                    title=f"Content Distribution ({len(selection)} titles)",
+                    color_discrete_sequence=['#E50914', '#00A8E1'],
+                    hole=0.4
+                )
+                fig.update_traces(
+                    textposition='inside', 
+                    textinfo='percent+label',
+                    marker=dict(line=dict(color='#1F1F1F', width=2))
+                )
+                fig.update_layout(
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    font=dict(color='white')
+                )
+            show_chart(fig, 'content_distribution')
         
         with col2:
             # Top countries with Netflix red color scale
-            country_counts = filtered_df['primary_country'].value_counts().head(8)
-            fig = px.bar(
-                x=country_counts.values,
-                y=country_counts.index,
-                orientation='h',
-                title="Top Countries in Selection",
-                labels={'x': 'Number of Titles', 'y': 'Country'},
-                color=country_counts.values,
-                color_continuous_scale='reds'
-            )
-            fig.update_layout(
-                yaxis={'categoryorder': 'total ascending', 'showgrid': False},
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='white'),
-                xaxis=dict(showgrid=False)
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            country_counts = data['country_counts']
+            with timings.span('chart/top_countries/build'):
+                fig = px.bar(
+                    x=country_counts.values,
+                    y=country_counts.index,
+                    orientation='h',
+                    title="Top Countries in Selection",
+                    labels={'x': 'Number of Titles', 'y': 'Country'},
+                    color=country_counts.values,
+                    color_continuous_scale='reds'
+                )
+                fig.update_layout(
+                    yaxis={'categoryorder': 'total ascending', 'showgrid': False},
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    font=dict(color='white'),
+                    xaxis=dict(showgrid=False)
+                )
+            show_chart(fig, 'top_countries')
         
         # Year-wise content addition with Netflix-style colors
         st.subheader("📅 Content Addition Timeline")
-        yearly_data = filtered_df.groupby(['year_added', 'type']).size().reset_index(name='count')
+        yearly_data = data['yearly_data']
         
         if not yearly_data.empty:
-            fig = px.bar(
-                yearly_data, 
-                x='year_added', 
-                y='count', 
-                color='type',
-                title="Content Added by Year and Type",
-                labels={'year_added': 'Year', 'count': 'Number of Titles'},
-                color_discrete_sequence=['#E50914', '#00A8E1']
-            )
-            fig.update_layout(
-                xaxis_title="Year", 
-                yaxis_title="Number of Titles",
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='white'),
-                legend=dict(
-                    orientation="h",
-                    yanchor="bottom",
-                    y=1.02,
-                    xanchor="right",
-                    x=1
+            with timings.span('chart/yearly_additions/build'):
+                fig = px.bar(
+                    yearly_data, 
+                    x='year_added', 
+                    y='count', 
+                    color='type',
+                    title="Content Added by Year and Type",
+                    labels={'year_added': 'Year', 'count': 'Number of Titles'},
+                    color_discrete_sequence=['#E50914', '#00A8E1']
                 )
-            )
-            st.plotly_chart(fig, use_container_width=True)
+                fig.update_layout(
+                    xaxis_title="Year", 
+                    yaxis_title="Number of Titles",
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    font=dict(color='white'),
+                    legend=dict(
+                        orientation="h",
+                        yanchor="bottom",
+                        y=1.02,
+                        xanchor="right",
+                        x=1
+                    )
+                )
+            show_chart(fig, 'yearly_additions')
         
         # Monthly patterns with smooth line
-        if filtered_df['year_added'].nunique() > 1:
-            monthly_data = filtered_df.groupby('month_added').size()
+        monthly_data = data['monthly_data']
+        if monthly_data is not None:
             month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
                           'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
             
-            fig = px.line(
-                x=[month_names[i-1] for i in monthly_data.index],
-                y=monthly_data.values,
-                title="Seasonal Content Addition Pattern",
-                labels={'x': 'Month', 'y': 'Average Titles Added'},
-                line_shape='spline'
-            )
-            fig.update_traces(
-                mode='lines+markers', 
-                line_color='#E50914',
-                marker=dict(size=8, color='#E50914')
-            )
-            fig.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='white'),
-                xaxis=dict(showgrid=False),
-                yaxis=dict(showgrid=False)
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            with timings.span('chart/monthly_pattern/build'):
+                fig = px.line(
+                    x=[month_names[i-1] for i in monthly_data.index],
+                    y=monthly_data.values,
+                    title="Seasonal Content Addition Pattern",
+                    labels={'x': 'Month', 'y': 'Average Titles Added'},
+                    line_shape='spline'
+                )
+                fig.update_traces(
+                    mode='lines+markers', 
+                    line_color='#E50914',
+                    marker=dict(size=8, color='#E50914')
+                )
+                fig.update_layout(
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    font=dict(color='white'),
+                    xaxis=dict(showgrid=False),
+                    yaxis=dict(showgrid=False)
+                )
+            show_chart(fig, 'monthly_pattern')
     
     else:
         st.warning("⚠️ No data matches the selected filters. Please adjust your selection.")
 
-with tab2:
+def render_genres():
     st.subheader("🎭 Genre Analysis")
     
-    if not filtered_df.empty:
-        # Explode genres for analysis
-        genre_df = filtered_df.explode('genres')
-        genre_counts = genre_df['genres'].value_counts().head(15)
+    if len(selection):
+        data = tab_result('genres')
+        genre_counts = data['genre_counts']
         
         col1, col2 = st.columns(2)
         
         with col1:
             # Top genres bar chart with Netflix red
-            fig = px.bar(
-                x=genre_counts.index,
-                y=genre_counts.values,
-                title="Most Popular Genres",
-                labels={'x': 'Genre', 'y': 'Number of Titles'},
-                color=genre_counts.values,
-                color_continuous_scale='reds'
-            )
-            fig.update_layout(
-                xaxis_tickangle=-45,
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='white'),
-                xaxis=dict(showgrid=False),
-                yaxis=dict(showgrid=False)
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            with timings.span('chart/top_genres/build'):
+                fig = px.bar(
+                    x=genre_counts.index,
+                    y=genre_counts.values,
+                    title="Most Popular Genres",
+                    labels={'x': 'Genre', 'y': 'Number of Titles'},
+                    color=genre_counts.values,
+                    color_continuous_scale='reds'
+                )
+                fig.update_layout(
+                    xaxis_tickangle=-45,
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    font=dict(color='white'),
+                    xaxis=dict(showgrid=False),
+                    yaxis=dict(showgrid=False)
+                )
+            show_chart(fig, 'top_genres')
         
         with col2:
             # Genre distribution by content type
-            genre_type_data = genre_df.groupby(['genres', 'type']).size().reset_index(name='count')
-            top_genres_list = genre_counts.head(10).index.tolist()
-            genre_type_filtered = genre_type_data[genre_type_data['genres'].isin(top_genres_list)]
+            genre_type_filtered = data['genre_type_filtered']
             
-            fig = px.bar(
-                genre_type_filtered,
-                x='genres',
-                y='count',
-                color='type',
-                title="Genre Distribution by Content Type",
-                labels={'genres': 'Genre', 'count': 'Count'},
-                color_discrete_sequence=['#E50914', '#00A8E1']
-            )
-            fig.update_layout(
-                xaxis_tickangle=-45,
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='white'),
-                legend=dict(
-                    orientation="h",
-                    yanchor="bottom",
-                    y=1.02,
-                    xanchor="right",
-                    x=1
+            with timings.span('chart/genre_by_type/build'):
+                fig = px.bar(
+                    genre_type_filtered,
+                    x='genres',
+                    y='count',
+                    color='type',
+                    title="Genre Distribution by Content Type",
+                    labels={'genres': 'Genre', 'count': 'Count'},
+                    color_discrete_sequence=['#E50914', '#00A8E1']
                 )
-            )
-            st.plotly_chart(fig, use_container_width=True)
+                fig.update_layout(
+                    xaxis_tickangle=-45,
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    font=dict(color='white'),
+                    legend=dict(
+                        orientation="h",
+                        yanchor="bottom",
+                        y=1.02,
+                        xanchor="right",
+                        x=1
+                    )
+                )
+            show_chart(fig, 'genre_by_type')
         
         # Genre evolution over time with animation
         if len(selected_genres) > 0:
             st.subheader("📈 Selected Genres Over Time")
-            genre_year_data = genre_df[genre_df['genres'].isin(selected_genres)].groupby(['year_added', 'genres']).size().reset_index(name='count')
-            
-            fig = px.line(
-                genre_year_data,
-                x='year_added',
-                y='count',
-                color='genres',
-                title="Evolution of Selected Genres",
-                labels={'year_added': 'Year', 'count': 'Number of Titles'},
-                line_shape='spline',
-                color_discrete_sequence=px.colors.sequential.Reds[1:]
-            )
-            fig.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='white'),
-                xaxis=dict(showgrid=False),
-                yaxis=dict(showgrid=False)
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            show_precomputed('genre_evolution')
 
-with tab3:
+def render_duration():
     st.subheader("⏱️ Duration Analysis")
     
-    if not filtered_df.empty:
+    if len(selection):
+        data = tab_result('duration')
         col1, col2 = st.columns(2)
         
         # Movies duration analysis
-        movies_df = filtered_df[filtered_df['type'] == 'Movie'].copy()
-        if not movies_df.empty and 'duration_minutes' in movies_df.columns:
+        if data['movie_count']:
             with col1:
                 st.write("🎬 **Movie Durations**")
                 
-                # Duration distribution with custom bins
-                fig = px.histogram(
-                    movies_df.dropna(subset=['duration_minutes']),
-                    x='duration_minutes',
-                    nbins=20,
-                    title="Movie Duration Distribution",
-                    labels={'duration_minutes': 'Duration (minutes)', 'count': 'Number of Movies'},
-                    color_discrete_sequence=['#E50914']
-                )
-                fig.update_layout(
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    font=dict(color='white'),
-                    xaxis=dict(showgrid=False),
-                    yaxis=dict(showgrid=False)
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                # Duration distribution, binned on the server
+                with timings.span('chart/movie_durations/build'):
+                    fig = histogram_bar(
+                        data['movie_durations'],
+                        title="Movie Duration Distribution",
+                        labels={'x': 'Duration (minutes)', 'y': 'Number of Movies'},
+                        color_discrete_sequence=['#E50914']
+                    )
+                    fig.update_layout(
+                        plot_bgcolor='rgba(0,0,0,0)',
+                        paper_bgcolor='rgba(0,0,0,0)',
+                        font=dict(color='white'),
+                        xaxis=dict(showgrid=False),
+                        yaxis=dict(showgrid=False)
+                    )
+                show_chart(fig, 'movie_durations')
                 
                 # Duration stats in columns
-                if not movies_df['duration_minutes'].isna().all():
+                movie_stats = data['movie_stats']
+                if movie_stats is not None:
                     col1a, col1b, col1c = st.columns(3)
                     with col1a:
-                        avg_duration = movies_df['duration_minutes'].mean()
-                        st.metric("Average", f"{avg_duration:.0f} min")
+                        st.metric("Average", f"{movie_stats['mean']:.0f} min")
                     with col1b:
-                        min_duration = movies_df['duration_minutes'].min()
-                        st.metric("Shortest", f"{min_duration:.0f} min")
+                        st.metric("Shortest", f"{movie_stats['min']:.0f} min")
                     with col1c:
-                        max_duration = movies_df['duration_minutes'].max()
-                        st.metric("Longest", f"{max_duration:.0f} min")
+                        st.metric("Longest", f"{movie_stats['max']:.0f} min")
         
         # TV Shows seasons analysis
-        tv_df = filtered_df[filtered_df['type'] == 'TV Show'].copy()
-        if not tv_df.empty and 'duration_seasons' in tv_df.columns:
+        if data['tv_count']:
             with col2:
                 st.write("📺 **TV Show Seasons**")
                 
-                season_counts = tv_df['duration_seasons'].value_counts().head(10)
-                fig = px.bar(
-                    x=season_counts.index,
-                    y=season_counts.values,
-                    title="TV Show Season Distribution",
-                    labels={'x': 'Number of Seasons', 'y': 'Number of Shows'},
-                    color=season_counts.values,
-                    color_continuous_scale='reds'
-                )
-                fig.update_layout(
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    font=dict(color='white'),
-                    xaxis=dict(showgrid=False),
-                    yaxis=dict(showgrid=False)
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                season_counts = data['season_counts']
+                with timings.span('chart/tv_seasons/build'):
+                    fig = px.bar(
+                        x=season_counts.index,
+                        y=season_counts.values,
+                        title="TV Show Season Distribution",
+                        labels={'x': 'Number of Seasons', 'y': 'Number of Shows'},
+                        color=season_counts.values,
+                        color_continuous_scale='reds'
+                    )
+                    fig.update_layout(
+                        plot_bgcolor='rgba(0,0,0,0)',
+                        paper_bgcolor='rgba(0,0,0,0)',
+                        font=dict(color='white'),
+                        xaxis=dict(showgrid=False),
+                        yaxis=dict(showgrid=False)
+                    )
+                show_chart(fig, 'tv_seasons')
                 
                 # Season stats in columns
-                if not tv_df['duration_seasons'].isna().all():
+                season_stats = data['season_stats']
+                if season_stats is not None:
                     col2a, col2b, col2c = st.columns(3)
                     with col2a:
-                        avg_seasons = tv_df['duration_seasons'].mean()
-                        st.metric("Average", f"{avg_seasons:.1f} seasons")
+                        st.metric("Average", f"{season_stats['mean']:.1f} seasons")
                     with col2b:
-                        min_seasons = tv_df['duration_seasons'].min()
+                        min_seasons = season_stats['min']
                         st.metric("Shortest", f"{min_seasons:.0f} season{'s' if min_seasons != 1 else ''}")
                     with col2c:
-                        max_seasons = tv_df['duration_seasons'].max()
-                        st.metric("Longest", f"{max_seasons:.0f} seasons")
+                        st.metric("Longest", f"{season_stats['max']:.0f} seasons")
+
+def show_wordcloud(background):
+    wordcloud_service = load_wordcloud_service(dataset, df)
+    st.session_state['precompute_wordcloud'] = True
+    if background:
+        ready, png = wordcloud_service.get_async(filter_key, row_ids, owner=precompute_owner)
+    else:
+        ready, png = wordcloud_service.get(filter_key, row_ids)
+
+    if ready:
+        if png:
+            st.image(png, use_container_width=True)
+        return
+
+    # Poll until the background render lands in the cache, then redraw the page
+    @st.fragment(run_every=1.0)
+    def wait_for_wordcloud():
+        if wordcloud_service.get_async(filter_key, row_ids)[0]:
+            st.rerun()
+        st.info("☁️ Rendering word cloud...")
+
+    wait_for_wordcloud()
 
-with tab4:
+def render_text():
     st.subheader("☁️ Text Analysis")
     
-    if not filtered_df.empty:
+    if len(selection):
+        data = tab_result('text')
         col1, col2 = st.columns(2)
         
         with col1:
-            # Word cloud with Netflix colors
-            if not filtered_df['title'].empty:
-                title_text = ' '.join(filtered_df['title'].dropna().astype(str))
-                if title_text.strip():
-                    wordcloud = WordCloud(
-                        width=800, 
-                        height=400, 
-                        background_color='#0F0F0F',
-                        colormap='Reds',
-                        max_words=100,
-                        contour_width=2,
-                        contour_color='#E50914'
-                    ).generate(title_text)
-                    
-                    fig, ax = plt.subplots(figsize=(10, 5))
-                    ax.imshow(wordcloud, interpolation='bilinear')
-                    ax.axis("off")
-                    ax.set_title("Title Word Cloud", fontsize=16, pad=20, color='white')
-                    fig.patch.set_facecolor('#0F0F0F')
-                    st.pyplot(fig)
+            # Word cloud with Netflix colors, drawn from precomputed term frequencies
+            st.write("☁️ **Title Word Cloud**")
+            background = st.toggle("Render in background", value=False, key="wordcloud_background")
+            with timings.span('chart/title_wordcloud'):
+                show_wordcloud(background)
         
         with col2:
-            # Description length analysis
-            fig = px.histogram(
-                filtered_df,
-                x='description_length',
-                nbins=30,
-                title="Description Length Distribution",
-                labels={'description_length': 'Characters', 'count': 'Number of Titles'},
-                color_discrete_sequence=['#E50914']
-            )
-            fig.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='white'),
-                xaxis=dict(showgrid=False),
-                yaxis=dict(showgrid=False)
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            # Description length analysis, binned on the server
+            with timings.span('chart/description_lengths/build'):
+                fig = histogram_bar(
+                    data['description_lengths'],
+                    title="Description Length Distribution",
+                    labels={'x': 'Characters', 'y': 'Number of Titles'},
+                    color_discrete_sequence=['#E50914']
+                )
+                fig.update_layout(
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    font=dict(color='white'),
+                    xaxis=dict(showgrid=False),
+                    yaxis=dict(showgrid=False)
+                )
+            show_chart(fig, 'description_lengths')
             
             # Stats in columns
             col2a, col2b = st.columns(2)
             with col2a:
-                avg_desc_length = filtered_df['description_length'].mean()
+                avg_desc_length = data['avg_description_length']
                 st.metric("Average Length", f"{avg_desc_length:.0f} chars")
             with col2b:
-                avg_title_length = filtered_df['title_length'].mean()
+                avg_title_length = data['avg_title_length']
                 st.metric("Average Title Length", f"{avg_title_length:.0f} chars")
 
-with tab5:
+def render_sentiment():
     st.subheader("😊 Sentiment Analysis")
     
-    if not filtered_df.empty:
+    if len(selection):
+        data = tab_result('sentiment')
         col1, col2 = st.columns(2)
         
         with col1:
             # Sentiment distribution with Netflix colors
-            sentiment_counts = filtered_df['sentiment_label'].value_counts()
+            sentiment_counts = data['sentiment_counts']
             colors = {'Positive': '#2ECC71', 'Neutral': '#F39C12', 'Negative': '#E74C3C'}
             
-            fig = px.pie(
-                values=sentiment_counts.values,
-                names=sentiment_counts.index,
-                title="Sentiment Distribution",
-                color=sentiment_counts.index,
-                color_discrete_map=colors,
-                hole=0.4
-            )
-            fig.update_traces(
-                textposition='inside', 
-                textinfo='percent+label',
-                marker=dict(line=dict(color='#1F1F1F', width=2))
-            )
-            fig.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='white')
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            with timings.span('chart/sentiment_distribution/build'):
+                fig = px.pie(
+                    values=sentiment_counts.values,
+                    names=sentiment_counts.index,
+                    title="Sentiment Distribution",
+                    color=sentiment_counts.index,
+                    color_discrete_map=colors,
+                    hole=0.4
+                )
+                fig.update_traces(
+                    textposition='inside', 
+                    textinfo='percent+label',
+                    marker=dict(line=dict(color='#1F1F1F', width=2))
+                )
+                fig.update_layout(
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    font=dict(color='white')
+                )
+            show_chart(fig, 'sentiment_distribution')
         
         with col2:
-            # Sentiment score distribution
-            fig = px.histogram(
-                filtered_df,
-                x='sentiment_score',
-                nbins=30,
-                title="Sentiment Score Distribution",
-                labels={'sentiment_score': 'Sentiment Score', 'count': 'Count'},
-                color_discrete_sequence=['#E50914']
-            )
-            fig.add_vline(
-                x=0, 
-                line_dash="dash", 
-                line_color="white", 
-                annotation_text="Neutral", 
-                annotation_position="top"
-            )
-            fig.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='white'),
-                xaxis=dict(showgrid=False),
-                yaxis=dict(showgrid=False)
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            # Sentiment score distribution, binned on the server
+            with timings.span('chart/sentiment_scores/build'):
+                fig = histogram_bar(
+                    data['score_histogram'],
+                    title="Sentiment Score Distribution",
+                    labels={'x': 'Sentiment Score', 'y': 'Count'},
+                    color_discrete_sequence=['#E50914']
+                )
+                fig.add_vline(
+                    x=0, 
+                    line_dash="dash", 
+                    line_color="white", 
+                    annotation_text="Neutral", 
+                    annotation_position="top"
+                )
+                fig.update_layout(
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    font=dict(color='white'),
+                    xaxis=dict(showgrid=False),
+                    yaxis=dict(showgrid=False)
+                )
+            show_chart(fig, 'sentiment_scores')
         
-        # NEW: Recommended titles based on sentiment
+        # Content-based recommendations: description, genre, country and rating
+        # similarity against the whole catalog
         st.subheader("🌟 Recommended Titles")
-        recommended_titles = filtered_df[filtered_df['sentiment_label'] == 'Positive'].nlargest(5, 'sentiment_score')
+        basis = st.radio(
+            "Recommend",
+            ["Like this selection", "Like a title"],
+            horizontal=True,
+            key="recommend_basis"
+        )
+        with timings.span('tab/sentiment/recommend'):
+            if basis == "Like this selection":
+                recommended_titles = engine.recommend(selection, RECOMMENDATIONS)
+            else:
+                # The selection, narrowed with the sidebar search, is the list to pick from
+                choices = row_ids[:RECOMMEND_TITLE_CHOICES]
+                titles = df['title'].to_numpy()
+                title_row = st.selectbox("Title", choices, format_func=lambda i: titles[i], key="recommend_title")
+                recommended_titles = engine.similar_titles(int(title_row), RECOMMENDATIONS)
         if not recommended_titles.empty:
             st.dataframe(
-                recommended_titles[['title', 'type', 'primary_country', 'sentiment_score']].style
-                .background_gradient(cmap='Greens', subset=['sentiment_score'])
-                .format({'sentiment_score': '{:.2f}'}),
+                recommended_titles[['title', 'type', 'primary_country', 'release_year', 'similarity']].style
+                .background_gradient(cmap='Greens', subset=['similarity'])
+                .format({'similarity': '{:.2f}'}),
+                hide_index=True,
                 use_container_width=True
             )
         else:
-            st.info("No highly-rated titles found with current filters")
+            st.info("No similar titles found with current filters")
 
-with tab6:
+def render_trends():
     st.subheader("📈 Advanced Trends")
     
-    if not filtered_df.empty:
+    if len(selection):
+        data = tab_result('trends')
         # Content growth rate with Netflix colors
-        yearly_counts = filtered_df['year_added'].value_counts().sort_index()
+        yearly_counts = data['yearly_counts']
         if len(yearly_counts) > 1:
-            fig = px.line(
-                x=yearly_counts.index,
-                y=yearly_counts.values,
-                title="Content Growth Over Time",
-                labels={'x': 'Year', 'y': 'Number of Titles Added'},
-                line_shape='spline'
-            )
-            fig.update_traces(
-                mode='lines+markers', 
-                line_color='#E50914',
-                marker=dict(size=8, color='#E50914')
-            )
-            fig.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='white'),
-                xaxis=dict(showgrid=False),
-                yaxis=dict(showgrid=False)
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            with timings.span('chart/content_growth/build'):
+                fig = px.line(
+                    x=yearly_counts.index,
+                    y=yearly_counts.values,
+                    title="Content Growth Over Time",
+                    labels={'x': 'Year', 'y': 'Number of Titles Added'},
+                    line_shape='spline'
+                )
+                fig.update_traces(
+                    mode='lines+markers', 
+                    line_color='#E50914',
+                    marker=dict(size=8, color='#E50914')
+                )
+                fig.update_layout(
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    font=dict(color='white'),
+                    xaxis=dict(showgrid=False),
+                    yaxis=dict(showgrid=False)
+                )
+            show_chart(fig, 'content_growth')
         
         # Content type trends over time
-        type_trends = filtered_df.groupby(['year_added', 'type']).size().unstack().fillna(0)
+        type_trends = data['type_trends']
         if not type_trends.empty:
-            fig = px.area(
-                type_trends,
-                title="Content Type Trends Over Time",
-                labels={'value': 'Number of Titles', 'year_added': 'Year'},
-                color_discrete_sequence=['#E50914', '#00A8E1']
-            )
-            fig.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='white'),
-                legend=dict(
-                    orientation="h",
-                    yanchor="bottom",
-                    y=1.02,
-                    xanchor="right",
-                    x=1
-                )
-            )
-            st.plotly_chart(fig, use_container_width=True)
-        
-        # Country trends
-        if selected_countries:
-            country_trends = filtered_df[filtered_df['primary_country'].isin(selected_countries)]
-            country_trends = country_trends.groupby(['year_added', 'primary_country']).size().unstack().fillna(0)
-            
-            if not country_trends.empty:
-                fig = px.line(
-                    country_trends,
-                    title="Content by Country Over Time",
+            with timings.span('chart/type_trends/build'):
+                fig = px.area(
+                    type_trends,
+                    title="Content Type Trends Over Time",
                     labels={'value': 'Number of Titles', 'year_added': 'Year'},
-                    color_discrete_sequence=px.colors.sequential.Reds[1:]
+                    color_discrete_sequence=['#E50914', '#00A8E1']
                 )
                 fig.update_layout(
                     plot_bgcolor='rgba(0,0,0,0)',
@@ -895,28 +985,186 @@ with tab6:
                         x=1
                     )
                 )
-                st.plotly_chart(fig, use_container_width=True)
+            show_chart(fig, 'type_trends')
+        
+        # Country trends
+        country_trends = data['country_trends']
+        if country_trends is not None:
+            if not country_trends.empty:
+                with timings.span('chart/country_trends/build'):
+                    fig = px.line(
+                        country_trends,
+                        title="Content by Country Over Time",
+                        labels={'value': 'Number of Titles', 'year_added': 'Year'},
+                        color_discrete_sequence=px.colors.sequential.Reds[1:]
+                    )
+                    fig.update_layout(
+                        plot_bgcolor='rgba(0,0,0,0)',
+                        paper_bgcolor='rgba(0,0,0,0)',
+                        font=dict(color='white'),
+                        legend=dict(
+                            orientation="h",
+                            yanchor="bottom",
+                            y=1.02,
+                            xanchor="right",
+                            x=1
+                        )
+                    )
+                show_chart(fig, 'country_trends')
+        
+        # Monthly additions projected forward; every series of the selection is
+        # fit in one batch and the fits are cached, so only the chart is per rerun
+        st.subheader("🔮 Content Addition Forecast")
+        col1, col2 = st.columns([2, 1])
+        with col1:
+            forecast_by = st.radio("Forecast By", ["Type", "Genre", "Country"], horizontal=True, key="forecast_by")
+        with col2:
+            horizon = st.slider("Months Ahead", 3, 36, FORECAST_HORIZON, step=3, key="forecast_horizon")
+        with timings.span('tab/trends/forecast'):
+            forecasts = engine.forecasts(selection, horizon)[forecast_by.lower()]
+        if not forecasts.empty:
+            # The series with the most recent additions, over the last few years of history
+            history = forecasts[forecasts['kind'] == 'history']
+            recent = history[history['month'] > history['month'].max() - pd.DateOffset(months=12)]
+            top = recent.groupby('series')['additions'].sum().nlargest(FORECAST_SERIES).index
+            shown = forecasts[
+                forecasts['series'].isin(top) &
+                (forecasts['month'] > history['month'].max() - pd.DateOffset(months=FORECAST_HISTORY_MONTHS))
+            ]
+            with timings.span('chart/forecast/build'):
+                fig = px.line(
+                    shown,
+                    x='month',
+                    y='additions',
+                    color='series',
+                    line_dash='kind',
+                    hover_data={'lower': ':.1f', 'upper': ':.1f', 'additions': ':.1f'},
+                    title=f"Monthly Additions by {forecast_by}, Next {horizon} Months",
+                    labels={'month': 'Month', 'additions': 'Titles Added', 'series': forecast_by, 'kind': ''},
+                    color_discrete_sequence=px.colors.sequential.Reds[::-1]
+                )
+                fig.update_layout(
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    font=dict(color='white'),
+                    xaxis=dict(showgrid=False),
+                    yaxis=dict(showgrid=False)
+                )
+            show_chart(fig, 'forecast')
         
         # Correlation analysis
         st.subheader("🔍 Correlation Analysis")
         
-        numeric_cols = filtered_df.select_dtypes(include=[np.number]).columns
-        if len(numeric_cols) > 1:
-            corr_matrix = filtered_df[numeric_cols].corr()
-            
-            fig = px.imshow(
-                corr_matrix,
-                text_auto=True,
-                aspect="auto",
-                color_continuous_scale='RdBu',
-                title="Correlation Matrix"
-            )
-            fig.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='white')
-            )
-            st.plotly_chart(fig, use_container_width=True)
+        show_precomputed('correlation_matrix')
+
+def render_people():
+    st.subheader("👥 People & Collaborations")
+    
+    if len(selection):
+        # Answered from the cast and director index: posting lists and co-occurrence
+        # matrices built once per dataset, sliced to the selected titles
+        with timings.span('tab/people/compute'):
+            data = engine.people_tables(selection)
+        col1, col2 = st.columns(2)
+        
+        for col, role, key, title in [
+            (col1, 'Actor', 'prolific_actors', "Most Prolific Actors"),
+            (col2, 'Director', 'prolific_directors', "Most Prolific Directors"),
+        ]:
+            with col:
+                counts = data[key]
+                if counts.empty:
+                    st.info(f"No {role.lower()} credits in the current selection")
+                    continue
+                with timings.span(f'chart/{key}/build'):
+                    fig = px.bar(
+                        x=counts.values,
+                        y=counts.index,
+                        orientation='h',
+                        title=title,
+                        labels={'x': 'Number of Titles', 'y': role},
+                        color=counts.values,
+                        color_continuous_scale='reds'
+                    )
+                    fig.update_layout(
+                        yaxis={'categoryorder': 'total ascending', 'showgrid': False},
+                        plot_bgcolor='rgba(0,0,0,0)',
+                        paper_bgcolor='rgba(0,0,0,0)',
+                        font=dict(color='white'),
+                        xaxis=dict(showgrid=False)
+                    )
+                show_chart(fig, key)
+        
+        # Strongest collaborations among the selected titles
+        st.subheader("🤝 Top Collaborations")
+        pair_type = st.radio(
+            "Collaboration Type",
+            ["Actor & Actor", "Director & Actor"],
+            horizontal=True,
+            key="collaboration_type"
+        )
+        pairs = data['actor_pairs'] if pair_type == "Actor & Actor" else data['director_pairs']
+        if not pairs.empty:
+            st.dataframe(pairs, hide_index=True, use_container_width=True)
+        else:
+            st.info("No collaborations found with current filters")
+        
+        # Collaborators of one person
+        st.subheader("🔎 Collaborator Lookup")
+        col1, col2 = st.columns([1, 2])
+        with col1:
+            role = st.selectbox("Role", ['actor', 'director'], format_func=str.capitalize, key="people_role")
+            people = engine.people.prolific(role, row_ids, 200).index.tolist()
+            person = st.selectbox("Person", people, key="people_person") if people else None
+        with col2:
+            if person is not None:
+                with timings.span('tab/people/collaborators'):
+                    collaborators = engine.collaborators(selection, role, person)
+                if not collaborators.empty:
+                    with timings.span('chart/collaborators/build'):
+                        fig = px.bar(
+                            x=collaborators.index,
+                            y=collaborators.values,
+                            title=f"Frequent Collaborators of {person}",
+                            labels={'x': 'Actor', 'y': 'Shared Titles'},
+                            color=collaborators.values,
+                            color_continuous_scale='reds'
+                        )
+                        fig.update_layout(
+                            xaxis_tickangle=-45,
+                            plot_bgcolor='rgba(0,0,0,0)',
+                            paper_bgcolor='rgba(0,0,0,0)',
+                            font=dict(color='white'),
+                            xaxis=dict(showgrid=False),
+                            yaxis=dict(showgrid=False)
+                        )
+                    show_chart(fig, 'collaborators')
+                else:
+                    st.info(f"{person} shares no selected titles with other actors")
+
+# Main content tabs with icons
+TABS = [
+    ("📊 Overview", 'overview', render_overview),
+    ("🎭 Genres", 'genres', render_genres),
+    ("⏱️ Duration", 'duration', render_duration),
+    ("☁️ Text Analysis", 'text', render_text),
+    ("😊 Sentiment", 'sentiment', render_sentiment),
+    ("📈 Trends", 'trends', render_trends),
+    ("👥 People", 'people', render_people),
+]
+
+# Lazy mode reruns on tab switches and only computes the selected tab
+lazy_tabs = st.sidebar.toggle("⚡ Render Only the Selected Tab", value=True, key="lazy_tabs")
+tab_containers = st.tabs(
+    [label for label, _, _ in TABS],
+    key="active_tab",
+    on_change="rerun" if lazy_tabs else "ignore"
+)
+for tab, (_, name, render) in zip(tab_containers, TABS):
+    if lazy_tabs and not tab.open:
+        continue
+    with tab, timings.span(f'tab/{name}'):
+        render()
 
 # Footer with Netflix-style branding
 st.markdown("---")
@@ -925,4 +1173,23 @@ st.markdown("""
     <p>Netflix Analytics Dashboard • Powered by Streamlit • Data from Netflix</p>
     <p style="font-size: 12px;">© 2023 Netflix Clone Analytics • Not affiliated with Netflix</p>
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+# Debug panel: where this rerun's time and memory went
+debug_timings = st.sidebar.toggle("🐞 Show Rerun Timings", value=False, key="debug_timings")
+run = timings.finish()
+if debug_timings and run is not None:
+    with st.sidebar.expander("🐞 Rerun Timings", expanded=True):
+        st.caption(
+            f"Total {run['total_ms']:.0f} ms • RSS {run['rss'] / 2**20:.0f} MiB "
+            f"({run['rss_delta'] / 2**20:+.1f} MiB this rerun)"
+        )
+        st.dataframe(
+            pd.DataFrame({
+                'Span': ['\u2003' * span['depth'] + span['name'] for span in run['spans']],
+                'ms': [span['ms'] for span in run['spans']],
+                'RSS Δ MiB': [span['rss_delta'] / 2**20 for span in run['spans']],
+            }).style.format({'ms': '{:.1f}', 'RSS Δ MiB': '{:+.2f}'}),
+            hide_index=True,
+            use_container_width=True
+        )
\ No newline at end of file
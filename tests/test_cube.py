@@ -0,0 +1,62 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aggregations import Selection
+from cube import COUNTRY_DIM, GENRE_DIM, CountCube
+from filters import FilterState, select_rows
+from indexes import MultiValueIndex
+
+
+def make_catalog():
+    # Dramas and Comedies tie on two titles each; Dramas appears first
+    data = pd.DataFrame({
+        'year_added': [2019, 2020, 2020, 2021, 2021],
+        'month_added': [1, 2, 3, 4, 5],
+        'type': ['Movie', 'TV Show', 'Movie', 'Movie', 'TV Show'],
+        'country': ['Japan', 'India, Japan', 'India', 'Japan', 'India'],
+        'primary_country': ['Japan', 'India', 'India', 'Japan', 'India'],
+        'sentiment_label': ['Positive', 'Negative', 'Negative', 'Positive', 'Neutral'],
+        'rating': ['PG', 'TV-MA', 'PG', 'R', 'TV-MA'],
+        'listed_in': ['Horror, Dramas', 'Comedies', 'Dramas', 'Comedies, Horror', 'Horror'],
+    })
+    genre_index = MultiValueIndex.from_strings(data['listed_in'])
+    country_index = MultiValueIndex.from_strings(data['country'])
+    cube = CountCube(data, {GENRE_DIM: genre_index, COUNTRY_DIM: country_index})
+    return data, genre_index, cube
+
+
+def selection(state):
+    data, genre_index, cube = make_catalog()
+    return Selection(data, select_rows(data, state, genre_index), state, cube)
+
+
+def test_top_counts_break_ties_like_value_counts():
+    sliced = selection(FilterState((2019, 2021), [], 'All', [], ''))
+    counted = selection(FilterState((2019, 2021), [], 'All', [], ''))
+    # Counted over the selected rows, as for a title search
+    counted.sliced_state = None
+    assert sliced.sliced_state is not None
+    expected = pd.Series(['Horror', 'Dramas', 'Comedies', 'Dramas', 'Comedies', 'Horror', 'Horror']).value_counts()
+    for sel in (sliced, counted):
+        genres = sel.top_counts(GENRE_DIM)
+        assert list(genres.items()) == list(expected.items())
+
+
+def test_genre_filter_naming_every_genre_is_sliced():
+    sel = selection(FilterState((2019, 2021), [], 'All', ['Comedies', 'Dramas', 'Horror'], ''))
+    assert sel.sliced_state is not None
+    assert selection(FilterState((2019, 2021), [], 'All', ['Dramas'], '')).sliced_state is None
+
+
+def test_counts_match_a_groupby_over_the_selected_rows():
+    state = FilterState((2020, 2021), ['India'], 'All', [], '')
+    sel = selection(state)
+    frame = sel.frame.assign(genres=sel.frame['listed_in'].str.split(', ')).explode('genres')
+    expected = frame.groupby(['year_added', 'genres']).size()
+    assert sel.count_by('year_added', GENRE_DIM).to_dict() == expected.to_dict()
+    assert np.array_equal(sel.count_by('type').to_numpy(), [1, 2])
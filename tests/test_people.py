@@ -0,0 +1,31 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from indexes import MultiValueIndex
+from people import PeopleIndex
+
+
+def make_people():
+    # Title 0 and 1 are directed by Aamir Khan, who also acts in both
+    cast = MultiValueIndex.from_strings(['Aamir Khan, Darsheel Safary', 'Aamir Khan, Tisca Chopra', 'Tisca Chopra', ''])
+    directors = MultiValueIndex.from_strings(['Aamir Khan', 'Aamir Khan', 'Someone Else', ''])
+    return PeopleIndex(cast, directors, [2008, 2009, 2010, np.nan], ['India', 'India', 'India', 'Unknown'])
+
+
+def test_director_is_not_their_own_collaborator():
+    people = make_people()
+    for rows in (None, np.array([0, 1, 2])):
+        collaborators = people.collaborators('director', 'Aamir Khan', rows)
+        assert 'Aamir Khan' not in collaborators.index
+        assert collaborators.to_dict() == {'Darsheel Safary': 1, 'Tisca Chopra': 1}
+
+
+def test_actor_is_not_their_own_collaborator():
+    people = make_people()
+    for rows in (None, np.array([0, 1, 2])):
+        collaborators = people.collaborators('actor', 'Aamir Khan', rows)
+        assert collaborators.to_dict() == {'Darsheel Safary': 1, 'Tisca Chopra': 1}
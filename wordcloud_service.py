@@ -0,0 +1,78 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from background import BackgroundJobs
+from indexes import MultiValueIndex
+
+# Same tokens WordCloud.process_text() keeps: words minus a trailing 's,
+# pure numbers and stopwords, merged case-insensitively
+TOKEN_PATTERN = r"\w[\w']*"
+
+WORDCLOUD_OPTIONS = dict(
+    width=800,
+    height=400,
+    background_color='#0F0F0F',
+    colormap='Reds',
+    max_words=100,
+    contour_width=2,
+    contour_color='#E50914',
+)
+
+
+def build_term_index(texts):
+    # Per-title term occurrences as a CSR index (a term repeated in a title appears repeatedly),
+    # plus the label to display for each term
+    from wordcloud import STOPWORDS
+
+    tokens = pd.Series(texts, dtype=object).fillna('').astype(str).reset_index(drop=True)
+    tokens = tokens.str.findall(TOKEN_PATTERN).explode().dropna()
+    tokens = tokens.where(~tokens.str.lower().str.endswith("'s"), tokens.str[:-2])
+    keys = tokens.str.lower()
+    keep = (tokens != '') & ~tokens.str.isdigit() & ~keys.isin({w.lower() for w in STOPWORDS})
+    tokens, keys = tokens[keep], keys[keep]
+    index = MultiValueIndex.from_exploded(keys, len(texts))
+
+    # Show each term in its most common spelling, as WordCloud does
+    spellings = pd.DataFrame({'key': keys.to_numpy(), 'word': tokens.to_numpy()})
+    display = (spellings.groupby(['key', 'word']).size()
+               .sort_values(ascending=False, kind='stable')
+               .reset_index().drop_duplicates('key').set_index('key')['word'])
+    return index, display.reindex(index.labels).to_numpy()
+
+
+class WordCloudService:
+    def __init__(self, titles, cache_size=64, ttl=3600, workers=1, options=WORDCLOUD_OPTIONS):
+        self.terms, self.display_labels = build_term_index(titles)
+        self.options = dict(options)
+        self.jobs = BackgroundJobs(workers=workers, cache_size=cache_size, ttl=ttl, name='wordcloud')
+
+    def frequencies(self, rows):
+        # Term frequencies of the selected titles: a sum over their rows of the term index
+        _, codes = self.terms.entries(rows)
+        counts = np.bincount(codes, minlength=len(self.terms.labels))
+        present = np.flatnonzero(counts)
+        return dict(zip(self.display_labels[present], counts[present].tolist()))
+
+    def render(self, rows):
+        # wordcloud (and the image stack behind it) is imported only once a cloud is drawn
+        from wordcloud import WordCloud
+
+        frequencies = self.frequencies(rows)
+        if not frequencies:
+            return None
+        image = WordCloud(**self.options).generate_from_frequencies(frequencies).to_image()
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG')
+        return buffer.getvalue()
+
+    def get(self, key, rows):
+        # (ready, PNG or None) for a filter state, rendering on the calling thread
+        # unless a background render of it is already under way
+        return True, self.jobs.result(key, self.render, rows)
+
+    def get_async(self, key, rows, owner=None):
+        # As get(), but renders on the executor and returns (False, None) until it is done
+        self.jobs.submit(key, self.render, np.array(rows), owner=owner)
+        return self.jobs.get(key)